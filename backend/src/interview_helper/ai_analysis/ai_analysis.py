@@ -11,6 +11,7 @@ from langchain.agents import create_agent
 from pydantic import BaseModel
 from textwrap import dedent
 import logging
+import anyio.to_thread
 
 """Simple interview analyzer with LLM."""
 
@@ -84,7 +85,10 @@ class SimpleAnalyzer:
 
         logger.info("Running Simple AI Analyzer")
 
-        interview_transcript = " ".join(get_all_transcripts(self.db, job.project_id))
+        transcripts = await anyio.to_thread.run_sync(
+            get_all_transcripts, self.db, job.project_id
+        )
+        interview_transcript = " ".join(transcripts)
 
         prompt = dedent(f"""\
             Current interview:
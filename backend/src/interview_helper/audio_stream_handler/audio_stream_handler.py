@@ -2,35 +2,78 @@ from aiortc.mediastreams import MediaStreamError
 from interview_helper.audio_stream_handler.types import AudioChunk
 from interview_helper.audio_stream_handler.types import PCMAudioArray
 import logging
-from typing import Optional
+import re
+import numpy as np
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from typing import cast
 from aiortc import RTCPeerConnection, RTCSessionDescription, RTCIceCandidate
 from aiortc.mediastreams import MediaStreamTrack
 from av.audio.frame import AudioFrame
 
-from interview_helper.audio_stream_handler.types import ICECandidate
 from interview_helper.context_manager import SessionContext
 from interview_helper.context_manager.resource_keys import (
     WEBSOCKET,
+    WEBRTC_MESSAGES,
     WEBRTC_PEER_CONNECTION,
 )
 from interview_helper.context_manager.messages import WebRTCMessage
 
-from interview_helper.audio_stream_handler.audio_utils import to_pcm
+from interview_helper.audio_stream_handler.audio_utils import ResamplerCache, to_pcm
 
 logger = logging.getLogger(__name__)
 
+# Seconds of audio collected before it's handed to the audio consumers
+AUDIO_CHUNK_SECONDS = 1
+
+# Number of WebRTC signaling messages waiting for the worker
+WEBRTC_MESSAGE_BUFFER_SIZE = 64
+
+# Number of pending audio chunks between the track receiver and the consumers
+AUDIO_CHUNK_BUFFER_SIZE = 8
+
+# The SDP attribute form, prefixed with "a=", is accepted as well
+_CANDIDATE_RE = re.compile(
+    r"(?:a=)?candidate:(?P<foundation>\S+) (?P<component>\d+) (?P<protocol>\S+)"
+    + r" (?P<priority>\d+) (?P<ip>\S+) (?P<port>\d+) typ (?P<type>\S+)"
+)
+
+
+async def queue_webrtc_message(ctx: SessionContext, message: WebRTCMessage):
+    """
+    Hands the message to the session's WebRTC worker.
+
+    Negotiation can take a while, so it runs outside the websocket receive
+    loop. Signaling messages can't be dropped, so this waits if the worker is
+    far enough behind.
+    """
+    messages = await ctx.get(WEBRTC_MESSAGES)
+    assert messages is not None, "WebRTC worker is always started before messages"
+    await messages.send(message)
+
+
+async def webrtc_message_worker(
+    ctx: SessionContext, messages: MemoryObjectReceiveStream[WebRTCMessage]
+):
+    """Handles the session's WebRTC messages one at a time, in order."""
+    async with messages:
+        async for message in messages:
+            await handle_webrtc_message(ctx, message)
+
 
 async def handle_webrtc_message(ctx: SessionContext, message: WebRTCMessage):
     message_type = message.type
 
-    logger.debug(f"Handling WebRTC message of type: {message_type}. Message: {message}")
+    logger.debug(
+        "Handling WebRTC message of type: %s. Message: %s", message_type, message
+    )
 
     if message_type == "offer":
         await handle_offer(ctx, message.data)
     elif message_type == "ice_candidate":
         await handle_ice_candidate(ctx, message.data)
     else:
-        logger.warning(f"Unknown WebRTC message type: {message_type}")
+        logger.warning("Unknown WebRTC message type: %s", message_type)
 
 
 async def handle_offer(ctx: SessionContext, offer_data: dict):
@@ -79,76 +122,112 @@ async def handle_offer(ctx: SessionContext, offer_data: dict):
     await ctx.register(WEBRTC_PEER_CONNECTION, peer_connection)
 
 
-async def handle_ice_candidate(ctx: SessionContext, candidate_data: dict):
+async def handle_ice_candidate(ctx: SessionContext, candidate_data: dict[str, object]):
     """Handle ICE candidate"""
     peer_connection = await ctx.get_or_wait(WEBRTC_PEER_CONNECTION)
 
     logger.debug("Found Ice Candidate")
 
-    parsed = parse_candidate(candidate_data["candidate"]["candidate"])
-
-    if parsed is None:
-        # No more candidates
-        await peer_connection.addIceCandidate(None)
+    fields = cast(dict[str, object], candidate_data["candidate"])
+    try:
+        candidate = parse_candidate(
+            cast(str, fields["candidate"]),
+            sdp_mid=cast(str | None, fields["sdpMid"]),
+            sdp_mline_index=cast(int | None, fields["sdpMLineIndex"]),
+        )
+    except ValueError as e:
+        # One bad candidate shouldn't end the session, the others may still work
+        logger.warning("Skipping ICE candidate: %s", e)
         return
 
-    candidate = RTCIceCandidate(
-        foundation=parsed.foundation,
-        component=parsed.component,
-        protocol=parsed.protocol,
-        priority=parsed.priority,
-        ip=parsed.ip,
-        port=parsed.port,
-        type=parsed.ice_type,
-        sdpMid=candidate_data["candidate"]["sdpMid"],
-        sdpMLineIndex=candidate_data["candidate"]["sdpMLineIndex"],
-    )
-
+    # None means no more candidates
     await peer_connection.addIceCandidate(candidate)
 
 
 async def audio_processing_task(track: MediaStreamTrack, ctx: SessionContext):
     """Process incoming audio frames from WebRTC track and send to session context"""
 
-    processed_audio_buffer: list[PCMAudioArray] = []
-
     await ctx.manager.set_active_audio_session(ctx.session_id)
 
+    # Receiving frames and running the audio consumers happen in separate tasks,
+    # so a slow consumer doesn't hold up the next track.recv(). The buffer is
+    # bounded: if consumers fall far enough behind, the receiver waits for them.
+    send_chunks, receive_chunks = anyio.create_memory_object_stream[AudioChunk](
+        AUDIO_CHUNK_BUFFER_SIZE
+    )
+
     try:
-        while True:
-            frame = await track.recv()
-            assert isinstance(frame, AudioFrame), "Incoming audio track is not a frame!"
-
-            # Decompress
-            chunk = to_pcm(frame)
-
-            processed_audio_buffer.extend(chunk.data)
-
-            # Arbitrary threshold
-            if len(processed_audio_buffer) > 100:
-                # Use last chunk since we standardize all the layouts
-                # to be the same.
-                await ctx.ingest_audio(
-                    AudioChunk(
-                        processed_audio_buffer,
-                        chunk.framerate,
-                        chunk.number_of_channels,
-                    )
+        async with anyio.create_task_group() as tg:
+            _ = tg.start_soon(ingest_audio_chunks, ctx, receive_chunks)
+            await receive_audio_chunks(track, send_chunks)
+    finally:
+        await finalize_audio_stream(ctx)
+
+
+async def receive_audio_chunks(
+    track: MediaStreamTrack, send_chunks: MemoryObjectSendStream[AudioChunk]
+):
+    # Raw s16 bytes, grown in place rather than kept as one array per frame
+    processed_audio_buffer = bytearray()
+    buffered_samples = 0
+    chunk: AudioChunk | None = None
+    resamplers: ResamplerCache = {}
+
+    async with send_chunks:
+        try:
+            while True:
+                frame = await track.recv()
+                assert isinstance(frame, AudioFrame), (
+                    "Incoming audio track is not a frame!"
                 )
 
-                processed_audio_buffer.clear()
-    except MediaStreamError:
-        pass  # Expected
-    finally:
+                # Decompress
+                chunk = to_pcm(frame, resamplers)
+
+                processed_audio_buffer.extend(chunk.data)
+                buffered_samples += len(chunk.data) // chunk.number_of_channels
+
+                # Flush on duration rather than frame count, since frame
+                # sizes vary between clients.
+                if buffered_samples >= chunk.framerate * AUDIO_CHUNK_SECONDS:
+                    # Use last chunk since we standardize all the layouts
+                    # to be the same.
+                    await send_chunks.send(
+                        AudioChunk(
+                            as_pcm(processed_audio_buffer),
+                            chunk.framerate,
+                            chunk.number_of_channels,
+                        )
+                    )
+
+                    # The sent chunk is a view of the old buffer, so start a new one
+                    processed_audio_buffer = bytearray()
+                    buffered_samples = 0
+        except MediaStreamError:
+            pass  # Expected
+
         # Flush audio_buffer
-        if len(processed_audio_buffer) > 0:
-            await ctx.ingest_audio(
+        if chunk is not None and len(processed_audio_buffer) > 0:
+            await send_chunks.send(
                 AudioChunk(
-                    processed_audio_buffer, chunk.framerate, chunk.number_of_channels
+                    as_pcm(processed_audio_buffer),
+                    chunk.framerate,
+                    chunk.number_of_channels,
                 )
             )
 
-        await finalize_audio_stream(ctx)
+
+def as_pcm(buffer: bytearray) -> PCMAudioArray:
+    """Views the buffered bytes as samples, without copying them."""
+    return np.frombuffer(buffer, dtype=np.int16)
+
+
+async def ingest_audio_chunks(
+    ctx: SessionContext, receive_chunks: MemoryObjectReceiveStream[AudioChunk]
+):
+    async with receive_chunks:
+        async for chunk in receive_chunks:
+            await ctx.ingest_audio(chunk)
 
 
 async def finalize_audio_stream(ctx: SessionContext):
@@ -166,19 +245,32 @@ async def finalize_audio_stream(ctx: SessionContext):
     await ctx.manager.clear_active_audio_session(ctx.session_id)
 
 
-def parse_candidate(candidate_str: str) -> Optional[ICECandidate]:
-    """Parse ICE candidate string into components"""
-    parts = candidate_str.split()
+def parse_candidate(
+    candidate_str: str,
+    sdp_mid: str | None = None,
+    sdp_mline_index: int | None = None,
+) -> RTCIceCandidate | None:
+    """
+    Parse ICE candidate string into components.
 
-    if len(parts) == 0:
+    Returns None for the empty end-of-candidates marker and raises ValueError
+    for a candidate that can't be parsed.
+    """
+    if not candidate_str.strip():
         return None
 
-    return ICECandidate(
-        foundation=parts[0].split(":")[1],
-        component=int(parts[1]),
-        protocol=parts[2].lower(),
-        priority=int(parts[3]),
-        ip=parts[4],
-        port=int(parts[5]),
-        ice_type=parts[7],
+    match = _CANDIDATE_RE.match(candidate_str)
+    if match is None:
+        raise ValueError(f"Malformed ICE candidate: {candidate_str!r}")
+
+    return RTCIceCandidate(
+        foundation=match["foundation"],
+        component=int(match["component"]),
+        protocol=match["protocol"].lower(),
+        priority=int(match["priority"]),
+        ip=match["ip"],
+        port=int(match["port"]),
+        type=match["type"],
+        sdpMid=sdp_mid,
+        sdpMLineIndex=sdp_mline_index,
     )
@@ -1,40 +1,92 @@
 from interview_helper.context_manager.resource_keys import WAVE_WRITE_FD
 from wave import Wave_write
-from interview_helper.audio_stream_handler.types import PCMAudioArray
 from pathlib import Path
 import numpy as np
 from av.audio.frame import AudioFrame
+from av.audio.resampler import AudioResampler
 import wave
 import logging
 import anyio.to_thread
 
 from interview_helper.context_manager.session_context_manager import SessionContext
 
-from interview_helper.audio_stream_handler.types import AudioChunk
+from interview_helper.audio_stream_handler.types import AudioChunk, PCMAudioArray
 
 logger = logging.getLogger(__name__)
 
+# Seconds of audio between updates of a recording's WAV header
+WAV_HEADER_PATCH_SECONDS = 30
+
+
+type ResamplerCache = dict[tuple[str, str, int], AudioResampler]
+
 
 def to_pcm(
     frame: AudioFrame,
+    resamplers: ResamplerCache | None = None,
 ) -> AudioChunk:
-    chunks: list[PCMAudioArray] = []
-
-    # Causes a robotic voice.
-    # resampler = AudioResampler(
-    #     format="s16p",
-    #     layout=layout,
-    #     rate=target_rate,
-    # )
+    """
+    Converts the frame to interleaved s16 samples.
 
-    # for rframe in resampler.resample(frame):
-    rframe = frame
-    arr = rframe.to_ndarray()
-    pcm = np.asarray(arr, dtype=np.int16)
+    Pass the same `resamplers` for every frame of a stream so conversions reuse
+    one resampler per input format. Resamplers buffer samples between calls,
+    so they shouldn't be shared between streams.
+    """
+    number_of_channels = len(frame.layout.channels)
+
+    # aiortc's Opus decoder already gives packed s16, which is used as is.
+    # Anything else is converted by libswresample, keeping layout and rate,
+    # rather than cast sample by sample in numpy.
+    if frame.format.name == "s16":
+        frames = [frame]
+    else:
+        if resamplers is None:
+            resamplers = {}
+        key = (frame.format.name, frame.layout.name, frame.sample_rate)
+        resampler = resamplers.get(key)
+        if resampler is None:
+            resampler = resamplers[key] = AudioResampler(
+                format="s16", layout=frame.layout.name, rate=frame.sample_rate
+            )
+        frames = resampler.resample(frame)
+
+    # Packed s16 is a single plane of interleaved samples. View it in place
+    # rather than through to_ndarray(), which copies. The plane may be padded,
+    # so only take the samples that are really there.
+    planes = [
+        np.frombuffer(
+            rframe.planes[0], dtype=np.int16, count=rframe.samples * number_of_channels
+        )
+        for rframe in frames
+    ]
+    # The resampler may hold samples back, or return more than one frame
+    if len(planes) == 1:
+        pcm = planes[0]
+    elif planes:
+        pcm = np.concatenate(planes)
+    else:
+        pcm = np.empty(0, dtype=np.int16)
+
+    return AudioChunk(
+        data=pcm,
+        framerate=frame.sample_rate,
+        number_of_channels=number_of_channels,
+    )
+
+
+def to_mono_pcm16(pcm: PCMAudioArray, number_of_channels: int) -> PCMAudioArray:
+    """
+    Downmixes interleaved int16 PCM to mono by averaging the channels.
 
-    chunks.append(pcm)
+    Sums in int32 instead of taking a float64 mean, so only one temporary is
+    allocated. Mono input is returned without a copy.
+    """
+    if number_of_channels == 1:
+        return pcm.reshape(-1)
 
-    return AudioChunk(data=chunks, framerate=frame.sample_rate, number_of_channels=2)
+    mixed = pcm.reshape(-1, number_of_channels).sum(axis=1, dtype=np.int32)
+    mixed //= number_of_channels
+    return mixed.astype(np.int16)
 
 
 async def close_write_to_disk_audio_consumer(ctx: SessionContext):
@@ -73,11 +125,21 @@ async_audio_write_to_disk_consumer_pair = (
 def write_pcmaudio_to_wav(audio_chunk: AudioChunk, open_wave_fd: Wave_write):
     """
     Writes an AudioChunk to a WAV file.
-    """
 
-    full_frame = np.concatenate(audio_chunk.data, axis=0)
+    The header's sizes are patched every WAV_HEADER_PATCH_SECONDS of audio,
+    so a recording cut short by a crash is readable up to the last patch.
+    """
 
     try:
-        open_wave_fd.writeframes(full_frame.tobytes())
+        # writeframes would also seek back and patch the header's sizes on every
+        # call, so frames are appended raw and the header is patched now and then.
+        # close() patches it once more at the end of the session.
+        frames_per_patch = open_wave_fd.getframerate() * WAV_HEADER_PATCH_SECONDS
+        patches_before = open_wave_fd.getnframes() // frames_per_patch
+
+        open_wave_fd.writeframesraw(audio_chunk.data)
+
+        if open_wave_fd.getnframes() // frames_per_patch > patches_before:
+            open_wave_fd.writeframes(b"")
     except AttributeError:
         pass  # Expected when closing the file, this is OK as we don't care about the last little bit.
@@ -0,0 +1,91 @@
+import wave
+from pathlib import Path
+
+import numpy as np
+from av.audio.frame import AudioFrame
+
+from interview_helper.audio_stream_handler.audio_utils import (
+    WAV_HEADER_PATCH_SECONDS,
+    ResamplerCache,
+    to_mono_pcm16,
+    to_pcm,
+    write_pcmaudio_to_wav,
+)
+from interview_helper.audio_stream_handler.types import AudioChunk
+
+
+def test_to_pcm_returns_interleaved_samples():
+    """Test that packed and planar frames both come out as interleaved s16."""
+    interleaved = np.arange(8, dtype=np.int16)
+    packed = AudioFrame.from_ndarray(
+        interleaved.reshape(1, -1), format="s16", layout="stereo"
+    )
+    planar = AudioFrame.from_ndarray(
+        interleaved.reshape(-1, 2).T.copy(), format="s16p", layout="stereo"
+    )
+
+    for frame in (packed, planar):
+        frame.sample_rate = 48000
+        chunk = to_pcm(frame)
+
+        assert chunk.number_of_channels == 2
+        assert chunk.framerate == 48000
+        assert chunk.data.tolist() == interleaved.tolist()
+
+
+def test_to_pcm_reuses_resampler_per_format():
+    """Test that consecutive planar frames of a stream share one resampler."""
+    resamplers: ResamplerCache = {}
+    chunks: list[np.ndarray] = []
+
+    for start in (0, 8):
+        interleaved = np.arange(start, start + 8, dtype=np.int16)
+        frame = AudioFrame.from_ndarray(
+            interleaved.reshape(-1, 2).T.copy(), format="s16p", layout="stereo"
+        )
+        frame.sample_rate = 48000
+        chunks.append(to_pcm(frame, resamplers).data)
+
+    assert len(resamplers) == 1
+    assert np.concatenate(chunks).tolist() == list(range(16))
+
+
+def test_to_mono_pcm16_averages_interleaved_channels():
+    """Test that each interleaved frame is averaged into one int16 sample."""
+    stereo = np.array([100, 300, -32768, -32768, 32767, 32767, 1, 2], dtype=np.int16)
+
+    mono = to_mono_pcm16(stereo, 2)
+
+    assert mono.dtype == np.int16
+    assert mono.tolist() == [200, -32768, 32767, 1]
+
+
+def test_to_mono_pcm16_passes_mono_through():
+    """Test that mono audio is returned without a copy."""
+    pcm = np.arange(4, dtype=np.int16).reshape(1, -1)
+
+    mono = to_mono_pcm16(pcm, 1)
+
+    assert mono.tolist() == [0, 1, 2, 3]
+    assert np.shares_memory(mono, pcm)
+
+
+def test_wav_header_is_patched_while_recording(tmp_path: Path):
+    """Test that a recording that is never closed still has a usable header."""
+    path = tmp_path / "recording.wav"
+    framerate = 100
+    chunk = AudioChunk(
+        np.zeros(framerate * WAV_HEADER_PATCH_SECONDS, dtype=np.int16), framerate, 1
+    )
+
+    with wave.open(str(path), "wb") as open_wave_fd:
+        open_wave_fd.setnchannels(1)
+        open_wave_fd.setsampwidth(2)
+        open_wave_fd.setframerate(framerate)
+
+        write_pcmaudio_to_wav(chunk, open_wave_fd)
+        write_pcmaudio_to_wav(chunk, open_wave_fd)
+
+        # Read it as it would be found after a crash, before close()
+        with wave.open(str(path), "rb") as recording:
+            assert recording.getnframes() == 2 * framerate * WAV_HEADER_PATCH_SECONDS
@@ -0,0 +1,83 @@
+from typing import override
+
+import pytest
+from aiortc import RTCIceCandidate, RTCPeerConnection
+from ulid import ULID
+
+from interview_helper.ai_analysis.ai_analysis import FakeAnalyzer
+from interview_helper.audio_stream_handler.audio_stream_handler import (
+    handle_ice_candidate,
+    parse_candidate,
+)
+from interview_helper.context_manager.resource_keys import WEBRTC_PEER_CONNECTION
+from interview_helper.context_manager.session_context_manager import AppContextManager
+from interview_helper.context_manager.types import ProjectId, UserId
+
+
+def test_parse_candidate():
+    candidate = "candidate:842163049 1 UDP 1677729535 203.0.113.7 55843 typ srflx"
+    parsed = parse_candidate(
+        candidate + " raddr 0.0.0.0 rport 0 generation 0",
+        sdp_mid="0",
+        sdp_mline_index=0,
+    )
+
+    assert parsed is not None
+    assert parsed.foundation == "842163049"
+    assert parsed.component == 1
+    assert parsed.protocol == "udp"
+    assert parsed.priority == 1677729535
+    assert parsed.ip == "203.0.113.7"
+    assert parsed.port == 55843
+    assert parsed.type == "srflx"
+    assert parsed.sdpMid == "0"
+    assert parsed.sdpMLineIndex == 0
+
+
+def test_parse_candidate_sdp_attribute():
+    """Test that a candidate written as an SDP attribute line is parsed"""
+    parsed = parse_candidate(
+        "a=candidate:842163049 1 udp 1677729535 203.0.113.7 55843 typ srflx"
+    )
+
+    assert parsed is not None
+    assert parsed.foundation == "842163049"
+    assert parsed.type == "srflx"
+
+
+def test_parse_candidate_end_of_candidates():
+    assert parse_candidate("") is None
+
+
+def test_parse_candidate_malformed():
+    with pytest.raises(ValueError):
+        _ = parse_candidate("candidate:1 1 udp")
+
+
+class FakePeerConnection(RTCPeerConnection):
+    def __init__(self):
+        super().__init__()
+        self.candidates: list[RTCIceCandidate | None] = []
+
+    @override
+    async def addIceCandidate(self, candidate: RTCIceCandidate | None) -> None:
+        self.candidates.append(candidate)
+
+
+@pytest.mark.anyio
+async def test_handle_ice_candidate_skips_malformed():
+    """Test that a malformed candidate is skipped instead of failing the session"""
+    context_manager = AppContextManager((), FakeAnalyzer)
+    ctx = await context_manager.new_session(UserId(ULID()), ProjectId(ULID()))
+    peer_connection = FakePeerConnection()
+    await ctx.register(WEBRTC_PEER_CONNECTION, peer_connection)
+
+    def candidate_data(candidate: str) -> dict[str, object]:
+        return {
+            "candidate": {"candidate": candidate, "sdpMid": "0", "sdpMLineIndex": 0}
+        }
+
+    await handle_ice_candidate(ctx, candidate_data("candidate:1 1 udp"))
+    await handle_ice_candidate(ctx, candidate_data(""))
+
+    assert peer_connection.candidates == [None]
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from ulid import ULID
+
+from interview_helper.ai_analysis.ai_analysis import FakeAnalyzer
+from interview_helper.audio_stream_handler.transcription import vosk_transcriber
+from interview_helper.audio_stream_handler.transcription.vosk_transcriber import (
+    RecognizerPool,
+    vosk_close_transcriber,
+    vosk_transcribe_audio_consumer,
+)
+from interview_helper.audio_stream_handler.types import AudioChunk
+from interview_helper.context_manager.concurrent_websocket import ConcurrentWebSocket
+from interview_helper.context_manager.resource_keys import (
+    TRANSCRIBER_SESSION,
+    WEBSOCKET,
+)
+from interview_helper.context_manager.session_context_manager import AppContextManager
+from interview_helper.context_manager.types import ProjectId, UserId
+from interview_helper.tests.shared import FakeWebSocket
+
+
+class FakeRecognizer:
+    def __init__(self, framerate: int):
+        self.framerate: int = framerate
+        self.resets: int = 0
+
+    def Reset(self) -> None:
+        self.resets += 1
+
+    def AcceptWaveform(self, _data: bytes) -> bool:
+        return False
+
+    def FinalResult(self) -> str:
+        return '{"text": ""}'
+
+
+def test_released_recognizer_is_reset_and_reused():
+    """Test that a released recognizer is reset and handed out again for its rate"""
+    created: list[FakeRecognizer] = []
+
+    def create(framerate: int):
+        rec = FakeRecognizer(framerate)
+        created.append(rec)
+        return rec
+
+    pool = RecognizerPool(create)
+
+    first = pool.acquire(16000)
+    pool.release(first)
+
+    assert created[0].resets == 1
+    assert pool.acquire(16000) is first
+    assert pool.acquire(48000) is not first
+    assert len(created) == 2
+
+
+def test_pool_keeps_at_most_max_idle():
+    """Test that the pool drops released recognizers once it holds max_idle_per_rate"""
+    pool = RecognizerPool(FakeRecognizer, max_idle_per_rate=1)
+
+    a = pool.acquire(16000)
+    b = pool.acquire(16000)
+    pool.release(a)
+    pool.release(b)
+
+    assert pool.idle_count(16000) == 1
+
+
+def test_prewarm_fills_pool():
+    """Test that prewarm leaves the requested number of idle recognizers"""
+    pool = RecognizerPool(FakeRecognizer)
+
+    pool.prewarm(48000, 2)
+
+    assert pool.idle_count(48000) == 2
+
+
+@pytest.mark.anyio
+async def test_chunk_after_close_acquires_a_recognizer(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test that a chunk after closing the transcriber doesn't share a pooled recognizer"""
+    pool = RecognizerPool(FakeRecognizer)
+
+    def get_pool(_model_path: object) -> RecognizerPool[FakeRecognizer]:
+        return pool
+
+    def get_settings(_self: object) -> SimpleNamespace:
+        return SimpleNamespace(vosk_model_path=None)
+
+    monkeypatch.setattr(vosk_transcriber, "get_recognizer_pool", get_pool)
+    monkeypatch.setattr(AppContextManager, "get_settings", get_settings)
+
+    context_manager = AppContextManager((), FakeAnalyzer)
+    ctx = await context_manager.new_session(UserId(ULID()), ProjectId(ULID()))
+    ws = FakeWebSocket()
+    await ws.accept()
+    await ctx.register(WEBSOCKET, await ConcurrentWebSocket(ws).start())
+
+    chunk = AudioChunk(np.zeros(960, dtype=np.int16), 48000, 1)
+
+    await vosk_transcribe_audio_consumer(ctx, chunk)
+    first = await ctx.get(TRANSCRIBER_SESSION)
+    assert first is not None
+
+    await vosk_close_transcriber(ctx)
+    assert await ctx.get(TRANSCRIBER_SESSION) is None
+    assert pool.idle_count(48000) == 1
+
+    await vosk_transcribe_audio_consumer(ctx, chunk)
+    assert await ctx.get(TRANSCRIBER_SESSION) is not None
+    # The session took the recognizer out of the pool rather than using it in place
+    assert pool.idle_count(48000) == 0
@@ -11,7 +11,7 @@ from interview_helper.context_manager.resource_keys import (
 )
 from interview_helper.context_manager.session_context_manager import SessionContext
 
-import numpy as np
+from interview_helper.audio_stream_handler.audio_utils import to_mono_pcm16
 import logging
 import anyio.to_thread
 
@@ -73,19 +73,19 @@ async def setup_and_get_azure_transcriber(
         except RuntimeError as e:
             # Portal has been closed (connection ended), silently ignore
             if "not running" in str(e).lower():
-                logger.debug(f"Portal closed, skipping transcript: {text[:50]}...")
+                logger.debug("Portal closed, skipping transcript: %.50s...", text)
             else:
-                logger.error(f"Error sending transcription: {e}")
+                logger.error("Error sending transcription: %s", e)
         except Exception as e:
-            logger.error(f"Error sending transcription: {e}")
+            logger.error("Error sending transcription: %s", e)
 
     def on_transcribed(evt: speechsdk.transcription.ConversationTranscriptionEventArgs):
-        print(f"Transcribed: {evt.result.text}")
+        logger.debug("Transcribed: %s", evt.result.text)
         if (
             evt.result.reason == speechsdk.ResultReason.RecognizedSpeech
             and evt.result.text
         ):
-            print(f"Emitting recognized speech: {evt.result.text}")
+            logger.debug("Emitting recognized speech: %s", evt.result.text)
             _publish_transcript_part(
                 evt.result.text, getattr(evt.result, "speaker_id", None)
             )
@@ -105,7 +105,7 @@ async def setup_and_get_azure_transcriber(
 async def azure_transcribe_audio_consumer(ctx: SessionContext, audio_chunk: AudioChunk):
     """
     Same signature & behavior as your Vosk consumer:
-    - Consumes AudioChunk(data: list[np.ndarray[int16 or float]], framerate: int, number_of_channels: int)
+    - Consumes AudioChunk(data: np.ndarray[int16], framerate: int, number_of_channels: int)
     - Pushes bytes to Azure
     - Emits finalized lines via accept_transcript(ctx, text, ws)
     """
@@ -116,16 +116,9 @@ async def azure_transcribe_audio_consumer(ctx: SessionContext, audio_chunk: Audi
     stream = await ctx.get(AZURE_STREAM)
     assert stream, f"stream in {ctx.session_id} is not initialized!"
 
-    # For each ndarray in .data, convert to mono int16 little-endian and push
-    for chunk in audio_chunk.data:
-        # Ensure contiguous mono int16
-        buf = (  # pyright: ignore[reportAny]
-            chunk.reshape(-1, audio_chunk.number_of_channels)  # pyright: ignore[reportAny]
-            .mean(axis=1)
-            .astype(np.int16)
-            .tobytes()
-        )
-        stream.write(buf)  # pyright: ignore[reportAny]
+    # Azure expects mono int16 little-endian
+    buf = to_mono_pcm16(audio_chunk.data, audio_chunk.number_of_channels).tobytes()
+    stream.write(buf)  # pyright: ignore[reportAny]
 
 
 async def azure_transcribe_stop(ctx: SessionContext):
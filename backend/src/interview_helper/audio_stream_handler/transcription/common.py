@@ -1,3 +1,5 @@
+import anyio.to_thread
+
 from interview_helper.context_manager.concurrent_websocket import ConcurrentWebSocket
 from interview_helper.context_manager.database import add_transcription
 from interview_helper.context_manager.messages import TranscriptionMessage
@@ -10,12 +12,14 @@ async def accept_transcript(ctx: SessionContext, text: str, ws: ConcurrentWebSoc
 
     # Add to DB
     added_transcription_id = TranscriptId.from_str(
-        add_transcription(
-            ctx.manager.db,
-            user_id=ctx.get_user_id(),
-            session_id=ctx.session_id,
-            project_id=ctx.project_id,
-            text=text,
+        await anyio.to_thread.run_sync(
+            lambda: add_transcription(
+                ctx.manager.db,
+                user_id=ctx.get_user_id(),
+                session_id=ctx.session_id,
+                project_id=ctx.project_id,
+                text=text,
+            )
         )
     )
 
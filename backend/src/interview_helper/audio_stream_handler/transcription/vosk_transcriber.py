@@ -9,19 +9,124 @@ from interview_helper.context_manager.resource_keys import (
     WEBSOCKET,
 )
 
-import numpy as np
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterator
+from functools import cache
+from pathlib import Path
+from typing import Protocol
+from weakref import WeakKeyDictionary
+from interview_helper.audio_stream_handler.audio_utils import to_mono_pcm16
+import anyio.to_thread
 import json
+import threading
 
 # Vosk isn't typed properly
 # pyright: reportAny=none,reportUnknownMemberType=none, reportUnknownArgumentType=none
 
 
+# aiortc decodes Opus, the WebRTC audio codec, at 48 kHz
+WEBRTC_SAMPLE_RATE = 48000
+
+
+class Recognizer(Protocol):
+    def Reset(self) -> None: ...
+
+
+class RecognizerPool[R: Recognizer]:
+    """
+    Free-list of recognizers, keyed by sample rate.
+
+    Recognizers allocate sizeable decoder state on the Vosk side, so instead of
+    creating one per session they are reset and handed to the next session.
+    """
+
+    def __init__(
+        self,
+        create_recognizer: Callable[[int], R],
+        max_idle_per_rate: int = 8,
+    ):
+        self._create_recognizer: Callable[[int], R] = create_recognizer
+        self._max_idle_per_rate: int = max_idle_per_rate
+        self._idle: defaultdict[int, deque[R]] = defaultdict(deque)
+        self._framerates: WeakKeyDictionary[R, int] = WeakKeyDictionary()
+        # Recognizers are released from worker threads as well as the event loop.
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self, framerate: int) -> R:
+        """Returns an idle recognizer for the sample rate, creating one if needed."""
+        with self._lock:
+            idle = self._idle[framerate]
+            if idle:
+                return idle.pop()
+
+        rec = self._create_recognizer(framerate)
+        with self._lock:
+            self._framerates[rec] = framerate
+        return rec
+
+    def release(self, rec: R) -> None:
+        """Resets the recognizer and keeps it for reuse, unless the pool is full."""
+        rec.Reset()
+
+        with self._lock:
+            framerate = self._framerates.get(rec)
+            if framerate is None:
+                return  # Not one of ours
+
+            idle = self._idle[framerate]
+            if len(idle) < self._max_idle_per_rate:
+                idle.append(rec)
+
+    def prewarm(self, framerate: int, count: int) -> None:
+        """Creates recognizers up front so the first sessions don't pay for it."""
+        recs = [self.acquire(framerate) for _ in range(count)]
+        for rec in recs:
+            self.release(rec)
+
+    def idle_count(self, framerate: int) -> int:
+        with self._lock:
+            return len(self._idle[framerate])
+
+
+@cache
+def get_recognizer_pool(model_path: Path) -> RecognizerPool[KaldiRecognizer]:
+    """Returns the process-wide recognizer pool for the model, loading it lazily."""
+    model: Model | None = None
+    model_lock = threading.Lock()
+
+    def create_recognizer(framerate: int) -> KaldiRecognizer:
+        nonlocal model
+        with model_lock:
+            if model is None:
+                model = Model(str(model_path.absolute()))
+
+        # Only the text of each result is used, so word-level timings are left
+        # off; that keeps Result() small and cheap to build and parse.
+        return KaldiRecognizer(model, framerate)
+
+    return RecognizerPool(create_recognizer)
+
+
+def prewarm_vosk_recognizers(model_path: Path, count: int = 2) -> None:
+    """
+    Loads the model and fills the pool at startup.
+
+    Blocking, run it in a worker thread.
+    """
+    get_recognizer_pool(model_path).prewarm(WEBRTC_SAMPLE_RATE, count)
+
+
 async def vosk_close_transcriber(ctx: SessionContext):
-    rec = await ctx.get(TRANSCRIBER_SESSION)
+    # Take the recognizer off the session before handing it back to the pool,
+    # so a later chunk acquires its own instead of sharing a pooled one
+    rec = await ctx.unregister(TRANSCRIBER_SESSION)
     ws = await ctx.get_or_wait(WEBSOCKET)
 
     if rec is not None:
-        text = json.loads(rec.FinalResult())["text"]
+        text = json.loads(await anyio.to_thread.run_sync(rec.FinalResult))["text"]
+
+        get_recognizer_pool(ctx.get_settings().vosk_model_path).release(rec)
+
         if text:
             await accept_transcript(ctx, text, ws)
 
@@ -34,23 +139,29 @@ async def vosk_transcribe_audio_consumer(ctx: SessionContext, audio_chunk: Audio
     ws = await ctx.get_or_wait(WEBSOCKET)
 
     if rec is None:
-        model = Model(str(ctx.get_settings().vosk_model_path.absolute()))
-        rec = KaldiRecognizer(model, audio_chunk.framerate)
-        rec.SetWords(True)
-        rec.SetPartialWords(True)
+        pool = get_recognizer_pool(ctx.get_settings().vosk_model_path)
+        # The first acquire loads the model from disk
+        rec = await anyio.to_thread.run_sync(pool.acquire, audio_chunk.framerate)
         await ctx.register(TRANSCRIBER_SESSION, rec)
 
-    for chunk in audio_chunk.data:
-        # Ensure dtype and contiguity
-        buf = (
-            chunk.reshape(-1, audio_chunk.number_of_channels)
-            .mean(axis=1)
-            .astype(np.int16)
-            .tobytes()
-        )
-
-        if rec.AcceptWaveform(buf):
-            # Finalized segment
-            text = json.loads(rec.Result())["text"]
-            if text:
-                await accept_transcript(ctx, text, ws)
+    # Decoding is blocking C code, so keep it off the event loop
+    texts = await anyio.to_thread.run_sync(
+        lambda: list(transcribe_chunk(rec, audio_chunk))
+    )
+    for text in texts:
+        await accept_transcript(ctx, text, ws)
+
+
+def transcribe_chunk(rec: KaldiRecognizer, audio_chunk: AudioChunk) -> Iterator[str]:
+    """
+    Feeds the audio chunk to the recognizer, yielding each finalized segment.
+
+    Nothing here awaits, so this is a plain generator rather than an async one.
+    """
+    buf = to_mono_pcm16(audio_chunk.data, audio_chunk.number_of_channels).tobytes()
+
+    if rec.AcceptWaveform(buf):
+        # Finalized segment
+        text = json.loads(rec.Result())["text"]
+        if text:
+            yield text
@@ -7,17 +7,7 @@ type PCMAudioArray = nptype.NDArray[np.int16]
 
 @dataclass
 class AudioChunk:
-    data: list[PCMAudioArray]
+    # Interleaved samples, one contiguous array for the whole chunk
+    data: PCMAudioArray
     framerate: int
     number_of_channels: int
-
-
-@dataclass
-class ICECandidate:
-    foundation: str
-    component: int
-    protocol: str
-    priority: int
-    ip: str
-    port: int
-    ice_type: str
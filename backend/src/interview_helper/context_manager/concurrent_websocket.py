@@ -1,11 +1,18 @@
 import anyio.abc
 import anyio
+import logging
 from anyio.abc import ObjectReceiveStream
+from collections.abc import AsyncIterator
 from typing import Optional
 
+from pydantic import ValidationError
+from starlette.websockets import WebSocketDisconnect
+
 from interview_helper.context_manager.types import WebSocketProtocol
 from interview_helper.context_manager.messages import Envelope, WebSocketMessage
 
+logger = logging.getLogger(__name__)
+
 
 class ConcurrentWebSocket:
     """
@@ -21,6 +28,8 @@ class ConcurrentWebSocket:
         await cws.start()
         await cws.send_message(model)
         await cws.receive_message()
+        async for msg in cws:  # Until the client disconnects
+            ...
         await cws.aclose()
     """
 
@@ -74,8 +83,9 @@ class ConcurrentWebSocket:
     ) -> None:
         async with recieve_stream_to_client:
             async for msg in recieve_stream_to_client:
-                msg_to_send = Envelope(message=msg)
-                await websocket.send_text(msg_to_send.model_dump_json())
+                # Equivalent to Envelope(message=msg).model_dump_json(), but skips
+                # building (and validating) an Envelope for every outgoing message.
+                await websocket.send_text(f'{{"message":{msg.model_dump_json()}}}')
 
     async def send_message(self, message: WebSocketMessage) -> None:
         await self._send_to_client.send(message)
@@ -84,3 +94,23 @@ class ConcurrentWebSocket:
         msg = await self._ws.receive_text()
         recv_msg = Envelope.model_validate_json(msg)
         return recv_msg.message
+
+    async def __aiter__(self) -> AsyncIterator[WebSocketMessage]:
+        """
+        Yields received messages, ending when the client disconnects.
+
+        Messages that aren't a valid Envelope are logged and skipped.
+        """
+        while True:
+            try:
+                msg = await self._ws.receive_text()
+            except WebSocketDisconnect:
+                return
+
+            try:
+                envelope = Envelope.model_validate_json(msg)
+            except ValidationError as e:
+                logger.warning("Skipping invalid websocket message: %s", e)
+                continue
+
+            yield envelope.message
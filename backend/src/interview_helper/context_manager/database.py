@@ -180,15 +180,19 @@ def get_all_transcripts(db: PersistentDatabase, project_id: ProjectId) -> list[s
     Gets all transcript results, sorted by creation date (ascending)
     """
     with db.begin() as conn:
-        rows = (
-            conn.execute(
-                sa.select(models.Transcription.text_output)
-                .where(models.Transcription.project_id == str(project_id))
-                .order_by(models.Transcription.created_at.asc())
-            )
-            .scalars()
-            .all()
+        return _select_all_transcripts(conn, project_id)
+
+
+def _select_all_transcripts(conn: sa.Connection, project_id: ProjectId) -> list[str]:
+    rows = (
+        conn.execute(
+            sa.select(models.Transcription.text_output)
+            .where(models.Transcription.project_id == str(project_id))
+            .order_by(models.Transcription.created_at.asc())
         )
+        .scalars()
+        .all()
+    )
 
     return list(rows)
 
@@ -315,23 +319,29 @@ def get_all_ai_analyses(
     Also joins with DismissedAIAnalysis to add
     """
     with db.begin() as conn:
-        rows = conn.execute(
-            sa.select(
-                models.AIAnalysis.analysis_id,
-                models.AIAnalysis.text,
-                models.AIAnalysis.span,
-                sa.case(
-                    (models.DismissedAIAnalysis.analysis_id.isnot(None), True),
-                    else_=False,
-                ).label("is_dismissed"),
-            )
-            .order_by(models.AIAnalysis.analysis_id.asc())
-            .outerjoin(
-                models.DismissedAIAnalysis,
-                models.AIAnalysis.analysis_id == models.DismissedAIAnalysis.analysis_id,
-            )
-            .where(models.AIAnalysis.project_id == str(project_id))
-        ).all()
+        return _select_all_ai_analyses(conn, project_id)
+
+
+def _select_all_ai_analyses(
+    conn: sa.Connection, project_id: ProjectId
+) -> list[AnalysisRow]:
+    rows = conn.execute(
+        sa.select(
+            models.AIAnalysis.analysis_id,
+            models.AIAnalysis.text,
+            models.AIAnalysis.span,
+            sa.case(
+                (models.DismissedAIAnalysis.analysis_id.isnot(None), True),
+                else_=False,
+            ).label("is_dismissed"),
+        )
+        .order_by(models.AIAnalysis.analysis_id.asc())
+        .outerjoin(
+            models.DismissedAIAnalysis,
+            models.AIAnalysis.analysis_id == models.DismissedAIAnalysis.analysis_id,
+        )
+        .where(models.AIAnalysis.project_id == str(project_id))
+    ).all()
 
     return [
         AnalysisRow(
@@ -344,6 +354,27 @@ def get_all_ai_analyses(
     ]
 
 
+@dataclass
+class ProjectCatchup:
+    transcripts: list[str]
+    ai_analyses: list[AnalysisRow]
+
+
+def get_project_catchup(
+    db: PersistentDatabase, project_id: ProjectId
+) -> ProjectCatchup:
+    """
+    Gets everything a newly connected client needs to catch up on a project
+
+    Both reads share one transaction, so they see the same snapshot.
+    """
+    with db.begin() as conn:
+        return ProjectCatchup(
+            transcripts=_select_all_transcripts(conn, project_id),
+            ai_analyses=_select_all_ai_analyses(conn, project_id),
+        )
+
+
 def dismiss_ai_analysis(db: PersistentDatabase, analysis_id: str, user_id: UserId):
     """
     A user dismisses an AI analysis
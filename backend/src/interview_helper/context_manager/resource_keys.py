@@ -4,8 +4,10 @@ from vosk import KaldiRecognizer
 from wave import Wave_write
 from aiortc.rtcpeerconnection import RTCPeerConnection
 from anyio.from_thread import BlockingPortal
+from anyio.streams.memory import MemoryObjectSendStream
 
 from interview_helper.context_manager.concurrent_websocket import ConcurrentWebSocket
+from interview_helper.context_manager.messages import WebRTCMessage
 from interview_helper.context_manager.types import ResourceKey
 
 
@@ -13,6 +15,7 @@ from interview_helper.context_manager.types import ResourceKey
 WEBSOCKET = ResourceKey[ConcurrentWebSocket]("websocket")
 
 WEBRTC_PEER_CONNECTION = ResourceKey[RTCPeerConnection]("webrtc")
+WEBRTC_MESSAGES = ResourceKey[MemoryObjectSendStream[WebRTCMessage]]("webrtc_messages")
 WAVE_WRITE_FD = ResourceKey[Wave_write]("wave_fd")
 TRANSCRIBER_SESSION = ResourceKey[KaldiRecognizer]("kalidi_transcriber")
 
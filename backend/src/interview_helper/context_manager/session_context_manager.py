@@ -1,6 +1,6 @@
 from collections.abc import Sequence
 from langchain_core.callbacks import BaseCallbackHandler
-from interview_helper.context_manager.messages import AIResultMessage
+from interview_helper.context_manager.messages import AIResultMessage, WebSocketMessage
 from interview_helper.context_manager.resource_keys import WEBSOCKET
 from interview_helper.context_manager.types import AIResult, TranscriptId
 from interview_helper.context_manager.types import AIJob
@@ -14,6 +14,7 @@ from typing import cast, TypeVar, Callable, Awaitable
 import anyio
 import anyio.abc
 import anyio.streams.memory
+import anyio.to_thread
 import sys
 
 from interview_helper.config import Settings
@@ -67,6 +68,12 @@ class SessionContext:
             session_id=self.session_id, key=key, value=value
         )
 
+    async def unregister(self, key: ResourceKey[T]) -> T | None:
+        """
+        Removes the resource from the store, returning it if it was registered
+        """
+        return await self.manager.unregister(session_id=self.session_id, key=key)
+
     async def get(self, key: ResourceKey[T]) -> T | None:
         """
         Gets the resource associated with the key
@@ -128,6 +135,10 @@ class AppContextManager:
     ):
         # We need to protect against race-conditions since our context might end up in an
         # inconsistent state between threads.
+        #
+        # All access happens on the event loop, so a method that doesn't await
+        # can't interleave with any other and doesn't take the lock. It's only
+        # needed around critical sections that await.
         self.lock = anyio.Lock()
 
         self.store: dict[tuple[ResourceKey[object], SessionId], object] = {}
@@ -139,6 +150,8 @@ class AppContextManager:
         ] = defaultdict(anyio.Event)
 
         self.session_data: dict[SessionId, AppContextManager.SessionData] = {}
+        # Index of session_data by project, so fan-out doesn't scan every session
+        self.project_sessions: dict[ProjectId, set[SessionId]] = defaultdict(set)
         self.active_sessions: set[SessionId] = set()
 
         self.session_task_group: dict[SessionId, anyio.abc.TaskGroup] = {}
@@ -179,6 +192,7 @@ class AppContextManager:
             self.session_data[session_id] = AppContextManager.SessionData(
                 project=project_id, user=user_id
             )
+            self.project_sessions[project_id].add(session_id)
 
             self.session_task_group[
                 session_id
@@ -225,17 +239,34 @@ class AppContextManager:
         """
         k = (key, session_id)
 
-        async with self.lock:
-            assert session_id in self.active_sessions, f"{session_id} is not active!"
-            assert k not in self.store, (
-                f"{key.name} already registered for SessionId({session_id})"
-            )
+        assert session_id in self.active_sessions, f"{session_id} is not active!"
+        assert k not in self.store, (
+            f"{key.name} already registered for SessionId({session_id})"
+        )
+
+        self.store[k] = value
+        self.store_keys[session_id].append(k)
 
-            self.store[k] = value
-            self.store_keys[session_id].append(k)
+        if k in self.waiting_events:
+            self.waiting_events[k].set()
 
-            if k in self.waiting_events:
-                self.waiting_events[k].set()
+    async def unregister(self, session_id: SessionId, key: ResourceKey[T]) -> T | None:
+        """
+        Removes the resource from the store, returning it if it was registered.
+        The key can then be registered again.
+        """
+        k = (key, session_id)
+
+        assert session_id in self.active_sessions, f"{session_id} is not active!"
+
+        if k not in self.store:
+            return None
+
+        self.store_keys[session_id].remove(k)
+        # Later waiters should wait for the next registration
+        _ = self.waiting_events.pop(k, None)
+
+        return cast(T, self.store.pop(k))
 
     async def get(self, session_id: SessionId, key: ResourceKey[T]) -> T | None:
         """
@@ -245,43 +276,29 @@ class AppContextManager:
             Assertion Error: If resource not registered already.
         """
 
-        async with self.lock:
-            assert session_id in self.active_sessions, f"{session_id} is not active!"
+        assert session_id in self.active_sessions, f"{session_id} is not active!"
 
-            return cast(T, self.store.get((key, session_id), None))
+        return cast(T, self.store.get((key, session_id), None))
 
     async def get_or_wait(self, session_id: SessionId, key: ResourceKey[T]) -> T:
-        async with self.lock:
-            assert session_id in self.active_sessions, f"{session_id} is not active!"
-
-            potential_value = cast(T | None, self.store.get((key, session_id), None))
+        assert session_id in self.active_sessions, f"{session_id} is not active!"
 
-            if potential_value is not None:
-                return potential_value
+        potential_value = cast(T | None, self.store.get((key, session_id), None))
 
-            # Get event
-            wait_for_value_event = self.waiting_events[(key, session_id)]
+        if potential_value is not None:
+            return potential_value
 
-        # Wait for value outside of critical section
-        await wait_for_value_event.wait()
-        async with self.lock:
-            return cast(T, self.store[(key, session_id)])
+        await self.waiting_events[(key, session_id)].wait()
+        return cast(T, self.store[(key, session_id)])
 
     async def set_active_audio_session(self, session_id: SessionId):
-        async with self.lock:
-            self.active_audio_sessions.add(session_id)
+        self.active_audio_sessions.add(session_id)
 
     async def clear_active_audio_session(self, session_id: SessionId):
-        event = None
+        self.active_audio_sessions.remove(session_id)
 
-        async with self.lock:
-            self.active_audio_sessions.remove(session_id)
-
-            if session_id in self.cleanup_waiting_event:
-                event = self.cleanup_waiting_event[session_id]
-
-        if event is not None:
-            event.set()
+        if session_id in self.cleanup_waiting_event:
+            self.cleanup_waiting_event[session_id].set()
 
     async def teardown_session(self, session_id: SessionId) -> None:
         """Teardown all resources for a websocket session"""
@@ -306,7 +323,11 @@ class AppContextManager:
 
             del self.store_keys[session_id]
 
-            del self.session_data[session_id]
+            project_id = self.session_data.pop(session_id).project
+            project_sessions = self.project_sessions[project_id]
+            project_sessions.discard(session_id)
+            if not project_sessions:
+                del self.project_sessions[project_id]
 
             self.active_sessions.remove(session_id)
 
@@ -331,12 +352,40 @@ class AppContextManager:
     async def accept_transcript(
         self, session_id: SessionId, text: str, transcript_id: TranscriptId
     ):
-        async with self.lock:
-            assert session_id in self.active_sessions, f"{session_id} is not active!"
+        assert session_id in self.active_sessions, f"{session_id} is not active!"
 
-            await self.text_coalescer[session_id].push(
-                text=text, transcript_id=transcript_id
-            )
+        # Push outside the lock: the coalescer's buffer may be full, and waiting
+        # on it mustn't hold up every other session's setup and teardown.
+        await self.text_coalescer[session_id].push(
+            text=text, transcript_id=transcript_id
+        )
+
+    async def broadcast_to_project(
+        self, project_id: ProjectId, message: WebSocketMessage
+    ) -> None:
+        """
+        Sends the message to every active session of the project.
+
+        Sends run concurrently so one slow client doesn't delay the others,
+        and a failing send is logged without affecting the rest.
+        """
+        # Snapshot, since sessions may end while we're sending
+        sessions = list(self.project_sessions.get(project_id, ()))
+
+        async def send_to_session(session_id: SessionId) -> None:
+            try:
+                if session_id not in self.active_sessions:
+                    return
+
+                ws = await self.get(session_id, WEBSOCKET)
+                if ws:
+                    await ws.send_message(message)
+            except Exception:
+                logger.exception("Failed to send %s to %s", message.type, session_id)
+
+        async with anyio.create_task_group() as tg:
+            for session_id in sessions:
+                _ = tg.start_soon(send_to_session, session_id)
 
     async def _submit_ai_processing_job(self, job: AIJob):
         assert self._workers_started
@@ -384,7 +433,7 @@ class AppContextManager:
             # Jobs are simply to "poke" the AI engine that data is incoming.
             # If it is already running that is fine, there will always be another "poke"
             async for job in recv:
-                logger.info(f"Attempting to Run AI Job: {job}")
+                logger.info("Attempting to Run AI Job: %s", job)
                 try:
                     if self.active_ai_analysis[job.project_id].locked():
                         continue
@@ -396,11 +445,12 @@ class AppContextManager:
 
                     analyses: list[AnalysisRow] = []
                     for result in results.questions:
-                        id = add_ai_analysis(
+                        id = await anyio.to_thread.run_sync(
+                            add_ai_analysis,
                             self.db,
-                            project_id=job.project_id,
-                            text=result.question,
-                            span=result.grounding_span,
+                            job.project_id,
+                            result.question,
+                            result.grounding_span,
                         )
 
                         analyses.append(
@@ -414,21 +464,9 @@ class AppContextManager:
 
                     logger.info(results)
 
-                    sessions: set[SessionId] = set()
-                    for session, data in self.session_data.items():
-                        logger.info(f"{session} {data}")
-                        if data.project == job.project_id:
-                            sessions.add(session)
-
-                    logger.info(sessions)
-                    for session in sessions:
-                        if session in self.active_sessions:
-                            ws = await self.get(session, WEBSOCKET)
-                            if ws:
-                                await ws.send_message(
-                                    AIResultMessage(insights=analyses)
-                                )
-                                logger.info(f"Sending {analyses} to {session}")
+                    await self.broadcast_to_project(
+                        job.project_id, AIResultMessage(insights=analyses)
+                    )
 
                 except Exception:
                     # Never let an exception kill the worker or the service TG
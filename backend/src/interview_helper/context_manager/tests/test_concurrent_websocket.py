@@ -1,5 +1,6 @@
 import pytest
 from anyio import wait_all_tasks_blocked
+from starlette.websockets import WebSocketDisconnect
 
 from interview_helper.tests.shared import FakeWebSocket
 
@@ -36,3 +37,31 @@ async def test_send_and_receive_message():
 
     # Check that closing it again doesn't break anything
     await cws.aclose()
+
+
+async def test_iterating_stops_on_disconnect():
+    ws = FakeWebSocket()
+    await ws.accept()
+
+    msgs = [TranscriptionMessage(text="hello"), TranscriptionMessage(text="world")]
+    for msg in msgs:
+        ws.enqueue(Envelope(message=msg).model_dump_json())
+    ws.enqueue(WebSocketDisconnect())
+
+    async with ConcurrentWebSocket(already_accepted_ws=ws) as cws:
+        assert [msg async for msg in cws] == msgs
+
+
+async def test_iterating_skips_invalid_messages():
+    """Test that a message that isn't a valid Envelope doesn't end the iteration"""
+    ws = FakeWebSocket()
+    await ws.accept()
+
+    msg = TranscriptionMessage(text="hello")
+    ws.enqueue("not json")
+    ws.enqueue('{"message": {"type": "unknown"}}')
+    ws.enqueue(Envelope(message=msg).model_dump_json())
+    ws.enqueue(WebSocketDisconnect())
+
+    async with ConcurrentWebSocket(already_accepted_ws=ws) as cws:
+        assert [msg async for msg in cws] == [msg]
@@ -1,6 +1,14 @@
 from interview_helper.context_manager.database import get_user_by_id
 from interview_helper.context_manager.database import get_or_add_user_by_oidc_id
 from interview_helper.context_manager.database import PersistentDatabase
+from interview_helper.context_manager.database import (
+    add_ai_analysis,
+    add_transcription,
+    create_new_project,
+    get_project_catchup,
+)
+from interview_helper.context_manager.types import ProjectId, SessionId
+from ulid import ULID
 import sqlalchemy as sa
 import pytest
 
@@ -46,3 +54,23 @@ def test_user_addition():
 
     assert added_user.user_id == added_user2.user_id == added_user3.user_id
     assert added_user.oidc_id == added_user2.oidc_id == added_user3.oidc_id
+
+
+def test_project_catchup():
+    db = PersistentDatabase.new_in_memory()
+
+    user = get_or_add_user_by_oidc_id(db, "test-oidc-id", "Test User")
+    project_id = ProjectId.from_str(create_new_project(db, user.user_id, "P")["id"])
+    other_project_id = ProjectId.from_str(
+        create_new_project(db, user.user_id, "Other")["id"]
+    )
+    session_id = SessionId(ULID())
+
+    _ = add_transcription(db, user.user_id, session_id, project_id, "hello")
+    _ = add_transcription(db, user.user_id, session_id, other_project_id, "nope")
+    analysis_id = add_ai_analysis(db, project_id, "insight", None)
+
+    catchup = get_project_catchup(db, project_id)
+
+    assert catchup.transcripts == ["hello"]
+    assert [a.analysis_id for a in catchup.ai_analyses] == [str(analysis_id)]
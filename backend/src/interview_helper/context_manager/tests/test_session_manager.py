@@ -1,4 +1,8 @@
 from interview_helper.ai_analysis.ai_analysis import FakeAnalyzer
+from interview_helper.context_manager.concurrent_websocket import ConcurrentWebSocket
+from interview_helper.context_manager.messages import Envelope, PingMessage
+from interview_helper.context_manager.resource_keys import WEBSOCKET
+from interview_helper.tests.shared import FakeWebSocket
 from ulid import ULID
 from interview_helper.context_manager.types import ProjectId, UserId
 import pytest
@@ -88,3 +92,43 @@ async def test_get_settings():
     # Ensure that this causes an error so we don't inadvertently use it in tests
     with pytest.raises(AssertionError):
         cm.get_settings()
+
+
+async def test_broadcast_to_project_only_reaches_project_sessions():
+    context_manager = AppContextManager((), FakeAnalyzer)
+    project_id = ProjectId(ULID())
+    other_project_id = ProjectId(ULID())
+
+    sockets: list[FakeWebSocket] = []
+    for pid in (project_id, project_id, other_project_id):
+        ctx = await context_manager.new_session(UserId(ULID()), pid)
+        ws = FakeWebSocket()
+        await ws.accept()
+        sockets.append(ws)
+        await ctx.register(WEBSOCKET, await ConcurrentWebSocket(ws).start())
+
+    msg = PingMessage()
+    await context_manager.broadcast_to_project(project_id, msg)
+    await anyio.wait_all_tasks_blocked()  # Let writers run
+
+    assert [len(ws.sent_messages) for ws in sockets] == [1, 1, 0]
+    assert Envelope.model_validate_json(sockets[0].sent_messages[0]).message == msg
+
+
+async def test_teardown_removes_session_from_project_index():
+    context_manager = AppContextManager((), FakeAnalyzer)
+    project_id = ProjectId(ULID())
+
+    ctx1 = await context_manager.new_session(UserId(ULID()), project_id)
+    ctx2 = await context_manager.new_session(UserId(ULID()), project_id)
+    assert context_manager.project_sessions[project_id] == {
+        ctx1.session_id,
+        ctx2.session_id,
+    }
+
+    # Session task groups are nested, so tear down in reverse order
+    await context_manager.teardown_session(ctx2.session_id)
+    assert context_manager.project_sessions[project_id] == {ctx1.session_id}
+
+    await context_manager.teardown_session(ctx1.session_id)
+    assert project_id not in context_manager.project_sessions
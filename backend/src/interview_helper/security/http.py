@@ -1,11 +1,15 @@
 from pydantic import BaseModel
 from fastapi.exceptions import HTTPException
 from fastapi import status
+from collections.abc import Sequence
 from typing import Any
+import anyio
 import jwt
 import httpx
 import logging
 
+from interview_helper.security.jwks_cache import JWKSCache
+
 logger = logging.getLogger(__name__)
 
 # pyright: reportAny=none
@@ -48,15 +52,38 @@ class TokenClaims(BaseModel):
     extra: dict[str, Any] = {}  # pyright: ignore[reportExplicitAny]
 
 
-def verify_jwt_token(
-    token: str, jwks_client: jwt.PyJWKClient, client_id: str, signing_algos: str
+def equivalent_issuers(issuer: str) -> list[str]:
+    """
+    The forms of the issuer a token may carry. Google writes the `iss` of some
+    ID tokens without the scheme, e.g. accounts.google.com.
+    """
+    without_scheme = issuer.removeprefix("https://")
+    return [issuer, without_scheme] if without_scheme != issuer else [issuer]
+
+
+async def verify_jwt_token(
+    token: str, jwks_cache: JWKSCache, issuer: str, signing_algos: Sequence[str]
 ) -> TokenClaims:
-    signing_key = jwks_client.get_signing_key_from_jwt(token).key
-    payload = jwt.decode(
-        token,
-        key=signing_key,
-        algorithms=signing_algos,
-    )
+    # Only the header is read before verification; the payload is decoded once,
+    # with PyJWT checking the signature, issuer and required claims in the same pass.
+    try:
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await jwks_cache.get_signing_key(kid)
+        payload = jwt.decode(
+            token,
+            key=signing_key.key,
+            algorithms=signing_algos,
+            issuer=equivalent_issuers(issuer),
+            options={"require": ["exp", "iat", "iss", "sub"]},
+        )
+    except jwt.PyJWTError as e:
+        raise TokenError(f"Invalid token: {e}") from e
+    except httpx.HTTPError as e:
+        # The provider's keys couldn't be fetched, the token may well be valid
+        raise TokenError(
+            f"Could not fetch signing keys: {e}",
+            code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        ) from e
 
     # We expect a standard JWT payload dict here
     assert isinstance(payload, dict), "Expected JWT payload to be a dictionary"
@@ -84,6 +111,7 @@ class OIDCUserInfo(BaseModel):
 async def get_user_info_from_oidc_provider(
     token: str,
     userinfo_endpoint: str,
+    client: httpx.AsyncClient,
 ) -> OIDCUserInfo:
     """
     Get user information from an OIDC provider using the access token.
@@ -91,6 +119,7 @@ async def get_user_info_from_oidc_provider(
     Args:
         token: The access token from the OIDC provider (without 'Bearer ' prefix)
         userinfo_endpoint: The userinfo endpoint URL from the OIDC provider
+        client: Shared HTTP client, so connections to the provider are reused
 
     Returns:
         OIDCUserInfo: User information from the OIDC provider
@@ -101,81 +130,76 @@ async def get_user_info_from_oidc_provider(
     # Remove 'Bearer ' prefix if present
     clean_token = token.removeprefix("Bearer ")
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            userinfo_endpoint,
-            headers={"Authorization": f"Bearer {clean_token}"},
-        )
+    response = await client.get(
+        userinfo_endpoint,
+        headers={"Authorization": f"Bearer {clean_token}"},
+    )
 
-        # We expect a successful 200 from the OIDC provider for valid tokens
-        assert response.status_code == 200, (
-            f"Failed to get user info: {response.status_code} {response.text}"
-        )
+    # We expect a successful 200 from the OIDC provider for valid tokens
+    assert response.status_code == 200, (
+        f"Failed to get user info: {response.status_code} {response.text}"
+    )
 
-        user_data = response.json()
-
-        # Extract standard claims
-        standard_claims = {
-            "sub",
-            "username",
-            "email",
-            "email_verified",
-            "name",
-            "given_name",
-            "family_name",
-            "picture",
-            "phone_number",
-            "phone_number_verified",
-        }
-
-        # Separate standard claims from custom attributes
-        standard_user_data = {
-            k: v for k, v in user_data.items() if k in standard_claims
-        }
-        custom_attributes = {
-            k: v for k, v in user_data.items() if k not in standard_claims
-        }
-
-        # Add custom attributes to the standard data
-        standard_user_data["custom_attributes"] = custom_attributes
-
-        return OIDCUserInfo(**standard_user_data)
-
-
-def get_oidc_userinfo_endpoint(oidc_authority: str) -> str:
-    """
-    Get the userinfo endpoint from the OIDC provider's well-known configuration.
+    user_data = response.json()
 
-    Args:
-        oidc_authority: The base URL of the OIDC provider (e.g., https://cognito-idp.us-west-2.amazonaws.com/us-west-2_abc123)
+    # Extract standard claims
+    standard_claims = {
+        "sub",
+        "username",
+        "email",
+        "email_verified",
+        "name",
+        "given_name",
+        "family_name",
+        "picture",
+        "phone_number",
+        "phone_number_verified",
+    }
 
-    Returns:
-        str: The userinfo endpoint URL
+    # Separate standard claims from custom attributes
+    standard_user_data = {k: v for k, v in user_data.items() if k in standard_claims}
+    custom_attributes = {k: v for k, v in user_data.items() if k not in standard_claims}
 
-    Raises:
-        TokenError: If the request fails or the userinfo_endpoint is not found in the configuration
-    """
-    # Ensure the authority URL doesn't end with a slash
-    oidc_authority = oidc_authority.rstrip("/")
+    # Add custom attributes to the standard data
+    standard_user_data["custom_attributes"] = custom_attributes
 
-    # Construct the well-known configuration URL
-    config_url = f"{oidc_authority}/.well-known/openid-configuration"
+    return OIDCUserInfo(**standard_user_data)
 
-    with httpx.Client() as client:
-        response = client.get(config_url)
 
-        # We expect a successful 200 from the OIDC provider
-        assert response.status_code == 200, (
-            f"Failed to get OIDC configuration: {response.status_code} {response.text}"
-        )
+class OIDCConfig(BaseModel):
+    """The parts of the provider's discovery document we use"""
+
+    issuer: str
+    authorization_endpoint: str
+    userinfo_endpoint: str
+    jwks_uri: str
+    id_token_signing_alg_values_supported: list[str] = []
 
-        config_data = response.json()
 
-        # Extract the userinfo endpoint
-        userinfo_endpoint = config_data.get("userinfo_endpoint")
+async def fetch_oidc_config(
+    config_url: str, client: httpx.AsyncClient, attempts: int = 3
+) -> OIDCConfig:
+    """
+    Fetch the OIDC provider's discovery document.
+
+    Args:
+        config_url: The provider's /.well-known/openid-configuration URL
+        client: Shared HTTP client
+        attempts: How many times to try before giving up
 
-        # userinfo_endpoint must be present for a valid OIDC configuration
-        assert userinfo_endpoint, "Userinfo endpoint not found in OIDC configuration"
+    Returns:
+        OIDCConfig: The endpoints and signing algorithms of the provider
 
-        logger.info(f"Found userinfo endpoint: {userinfo_endpoint}")
-        return userinfo_endpoint
+    Raises:
+        httpx.HTTPError: If the document still can't be fetched on the last attempt
+    """
+    for attempt in range(1, attempts):
+        try:
+            response = await client.get(config_url)
+            return OIDCConfig.model_validate(response.raise_for_status().json())
+        except httpx.HTTPError as e:
+            logger.warning("Fetching OIDC configuration failed (%s), retrying", e)
+            await anyio.sleep(attempt)
+
+    response = await client.get(config_url)
+    return OIDCConfig.model_validate(response.raise_for_status().json())
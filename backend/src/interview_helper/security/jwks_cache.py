@@ -1,36 +1,85 @@
+import logging
 import time
-from authlib.jose.rfc7517.key_set import KeySet
-from typing import cast
-from authlib.jose.rfc7517.jwk import JsonWebKey
+import anyio
 import httpx
+import jwt
+
+logger = logging.getLogger(__name__)
 
 
 class JWKSCache:
-    def __init__(self, OIDC_CONFIG_URL: str, ttl_seconds: int = 3600):
+    """
+    The OIDC provider's signing keys, indexed by key id.
+
+    Keys are fetched once and reused until the TTL passes, so verifying a token
+    doesn't make a request. An unknown key id forces one refresh, in case the
+    provider rotated its keys. Running `run_refresh_loop` in the background
+    renews the keys before they expire, so requests don't wait on the provider.
+    """
+
+    def __init__(
+        self,
+        jwks_uri: str,
+        ttl_seconds: int = 3600,
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        self.jwks_uri: str = jwks_uri
         self.ttl = ttl_seconds
-        self.expires_at = 0
-        self.key_set = cast(KeySet | None, None)
-        self.jwks_uri = None
-        self.OIDC_CONFIG_URL = OIDC_CONFIG_URL
-
-    async def _fetch_config_and_keys(self):
-        async with httpx.AsyncClient(timeout=10) as client:
-            cfg = (await client.get(self.OIDC_CONFIG_URL)).json()
-            self.jwks_uri = cfg["jwks_uri"]
-
-            jwks = (await client.get(self.jwks_uri)).json()
-        self.key_set = JsonWebKey.import_key_set(jwks)
-        self.expires_at = int(time.time()) + self.ttl
-
-    async def get_keys(self) -> KeySet:
-        now = int(time.time())
-        if not self.key_set or now >= self.expires_at:
-            await self._fetch_config_and_keys()
-
-        assert self.key_set is not None
-        return self.key_set
-
-    async def refresh_on_kid_miss(self):
-        # Force refresh (use when header.kid not found)
-        self.expires_at = 0
-        return await self.get_keys()
+        self.expires_at = 0.0
+        self.keys: dict[str, jwt.PyJWK] = {}
+        self._http_client: httpx.AsyncClient | None = http_client
+        self._refresh_lock: anyio.Lock = anyio.Lock()
+
+    async def refresh(self) -> None:
+        if self._http_client is None:
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.get(self.jwks_uri)
+        else:
+            response = await self._http_client.get(self.jwks_uri)
+
+        jwks = jwt.PyJWKSet.from_dict(response.raise_for_status().json())  # pyright: ignore[reportAny]
+        self.keys = {key.key_id: key for key in jwks.keys if key.key_id}
+        self.expires_at = time.time() + self.ttl
+
+    async def _refresh_unless_replaced(self, seen: dict[str, jwt.PyJWK]) -> None:
+        """
+        Refreshes the keys, unless someone else already replaced `seen` while we
+        waited. Requests that miss at the same time then share a single fetch.
+        """
+        async with self._refresh_lock:
+            if self.keys is seen:
+                await self.refresh()
+
+    async def get_signing_key(self, kid: str | None) -> jwt.PyJWK:
+        if not kid:
+            raise jwt.PyJWKClientError("Token has no key id")
+
+        keys = self.keys
+        if time.time() >= self.expires_at:
+            await self._refresh_unless_replaced(keys)
+            keys = self.keys
+
+        key = keys.get(kid)
+        if key is None:
+            # Force refresh once, the provider may have rotated its keys
+            await self._refresh_unless_replaced(keys)
+            key = self.keys.get(kid)
+
+        if key is None:
+            raise jwt.PyJWKClientError(f"No signing key matches kid {kid!r}")
+
+        return key
+
+    async def run_refresh_loop(
+        self, margin_seconds: float = 60, retry_seconds: float = 30
+    ) -> None:
+        """Refreshes the keys `margin_seconds` before they expire, until cancelled."""
+        while True:
+            await anyio.sleep(max(self.expires_at - margin_seconds - time.time(), 0))
+            try:
+                await self.refresh()
+            except Exception:
+                # Keep serving the current keys, they are still valid for a while.
+                # Any error is retried, the loop must not die and let them expire.
+                logger.exception("Refreshing JWKS failed, retrying")
+                await anyio.sleep(retry_seconds)
@@ -0,0 +1,55 @@
+"""
+Per-key rate limiting for authenticated endpoints.
+
+Each key gets a token bucket that refills continuously, so a request only
+does a few float operations instead of scanning a history of timestamps.
+"""
+
+import time
+
+
+class TokenBucketRateLimiter:
+    """In-memory token-bucket rate limiter, keyed by e.g. the user's subject."""
+
+    def __init__(self, capacity: int, per_seconds: float):
+        self._capacity: float = float(capacity)
+        self._refill_rate: float = capacity / per_seconds  # tokens per second
+        # key -> (tokens, last refill time)
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+        # A bucket idle for this long has refilled completely, so dropping it
+        # is equivalent to keeping it.
+        self._idle_after: float = per_seconds
+        self._next_sweep: float = 0.0
+
+    def allow(self, key: str, current_time: float | None = None) -> bool:
+        """Takes a token from the key's bucket, returning False if it's empty."""
+        now = time.time() if current_time is None else current_time
+
+        self._sweep_idle(now)
+
+        tokens, last = self._buckets.get(key, (self._capacity, now))
+        tokens = min(self._capacity, tokens + (now - last) * self._refill_rate)
+
+        if tokens < 1:
+            return False
+
+        self._buckets[key] = (tokens - 1, now)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _sweep_idle(self, now: float) -> None:
+        """Drop full buckets, at most once per refill period, to bound memory."""
+        if now < self._next_sweep:
+            return
+
+        self._next_sweep = now + self._idle_after
+        idle = [
+            key
+            for key, (_, last) in self._buckets.items()
+            if now - last >= self._idle_after
+        ]
+        for key in idle:
+            del self._buckets[key]
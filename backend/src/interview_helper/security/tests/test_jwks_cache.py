@@ -0,0 +1,203 @@
+import json
+import time
+from typing import cast
+
+import anyio
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from interview_helper.security.http import TokenError, verify_jwt_token
+from interview_helper.security.jwks_cache import JWKSCache
+
+pytestmark = pytest.mark.anyio
+
+JWKS_URI = "https://idp.example.com/jwks"
+
+
+def make_jwk(kid: str) -> tuple[rsa.RSAPrivateKey, dict[str, str]]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = cast(
+        dict[str, str], json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+    )
+    return private_key, {**jwk, "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+def make_cache(jwks: list[dict[str, str]], requests: list[httpx.Request]):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"keys": jwks})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return JWKSCache(JWKS_URI, http_client=client)
+
+
+async def test_verify_uses_cached_keys():
+    """Test that tokens are verified against the cached keys."""
+    private_key, jwk = make_jwk("key-1")
+    requests: list[httpx.Request] = []
+    cache = make_cache([jwk], requests)
+    await cache.refresh()
+
+    now = int(time.time())
+    token = jwt.encode(
+        {"iss": "idp", "sub": "user", "iat": now, "exp": now + 60},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+
+    claims = await verify_jwt_token(token, cache, "idp", ["RS256"])
+    claims = await verify_jwt_token(token, cache, "idp", ["RS256"])
+
+    assert claims.sub == "user"
+    assert len(requests) == 1
+
+
+async def test_unknown_kid_refreshes_once():
+    """Test that an unknown key id forces one refresh, then fails."""
+    _, jwk = make_jwk("key-1")
+    requests: list[httpx.Request] = []
+    cache = make_cache([jwk], requests)
+    await cache.refresh()
+
+    with pytest.raises(jwt.PyJWKClientError):
+        _ = await cache.get_signing_key("rotated-key")
+
+    assert len(requests) == 2
+
+
+async def test_concurrent_misses_share_one_refresh():
+    """Test that requests missing the same rotated key only refresh once."""
+    _, old_jwk = make_jwk("old-key")
+    _, new_jwk = make_jwk("new-key")
+    jwks = [old_jwk]
+    requests: list[httpx.Request] = []
+    cache = make_cache(jwks, requests)
+    await cache.refresh()
+
+    jwks[:] = [new_jwk]  # The provider rotates its keys
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            _ = tg.start_soon(cache.get_signing_key, "new-key")
+
+    assert len(requests) == 2
+
+
+async def test_refresh_loop_renews_keys_before_expiry():
+    """Test that the background loop refreshes keys ahead of their expiry."""
+    _, jwk = make_jwk("key-1")
+    requests: list[httpx.Request] = []
+    cache = make_cache([jwk], requests)
+    cache.ttl = 60
+    await cache.refresh()
+
+    with anyio.move_on_after(0.2):
+        await cache.run_refresh_loop(margin_seconds=59.9)
+
+    assert len(requests) >= 2
+    assert "key-1" in cache.keys
+
+
+async def test_refresh_loop_survives_unexpected_errors():
+    """Test that the background loop keeps retrying after a malformed response."""
+    _, jwk = make_jwk("key-1")
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            return httpx.Response(200, content=b"not json")
+        return httpx.Response(200, json={"keys": [jwk]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = JWKSCache(JWKS_URI, http_client=client)
+
+    with anyio.move_on_after(0.2):
+        await cache.run_refresh_loop(retry_seconds=0.01)
+
+    assert len(requests) >= 2
+    assert "key-1" in cache.keys
+
+
+async def test_verify_rejects_token_missing_claims():
+    """Test that a correctly signed token without required claims is rejected."""
+    private_key, jwk = make_jwk("key-1")
+    cache = make_cache([jwk], [])
+    await cache.refresh()
+
+    token = jwt.encode(
+        {"iss": "idp", "sub": "user", "iat": int(time.time())},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+
+    with pytest.raises(TokenError):
+        _ = await verify_jwt_token(token, cache, "idp", ["RS256"])
+
+
+async def test_verify_rejects_token_from_other_issuer():
+    """Test that a correctly signed token from another issuer is rejected."""
+    private_key, jwk = make_jwk("key-1")
+    cache = make_cache([jwk], [])
+    await cache.refresh()
+
+    now = int(time.time())
+    token = jwt.encode(
+        {"iss": "other-idp", "sub": "user", "iat": now, "exp": now + 60},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+
+    with pytest.raises(TokenError):
+        _ = await verify_jwt_token(token, cache, "idp", ["RS256"])
+
+
+async def test_verify_accepts_issuer_without_scheme():
+    """Test that a token whose iss omits the scheme, as Google's can, is accepted."""
+    private_key, jwk = make_jwk("key-1")
+    cache = make_cache([jwk], [])
+    await cache.refresh()
+
+    now = int(time.time())
+    token = jwt.encode(
+        {"iss": "accounts.google.com", "sub": "user", "iat": now, "exp": now + 60},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+
+    claims = await verify_jwt_token(
+        token, cache, "https://accounts.google.com", ["RS256"]
+    )
+
+    assert claims.iss == "accounts.google.com"
+
+
+async def test_verify_reports_unreachable_provider():
+    """Test that failing to fetch the signing keys is a 503, not a crash."""
+    private_key, _ = make_jwk("key-1")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("unreachable", request=request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    cache = JWKSCache(JWKS_URI, http_client=client)
+
+    now = int(time.time())
+    token = jwt.encode(
+        {"iss": "idp", "sub": "user", "iat": now, "exp": now + 60},
+        private_key,
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+
+    with pytest.raises(TokenError) as exc_info:
+        _ = await verify_jwt_token(token, cache, "idp", ["RS256"])
+
+    assert exc_info.value.status_code == 503
@@ -0,0 +1,41 @@
+from interview_helper.security.rate_limit import TokenBucketRateLimiter
+
+
+def test_rate_limit_allows_up_to_capacity():
+    """Test that a burst is limited to the bucket capacity."""
+    limiter = TokenBucketRateLimiter(capacity=3, per_seconds=60)
+
+    assert [limiter.allow("user", current_time=0) for _ in range(4)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+
+    # Other users have their own bucket
+    assert limiter.allow("other", current_time=0)
+
+
+def test_rate_limit_refills_over_time():
+    """Test that tokens come back at capacity / per_seconds."""
+    limiter = TokenBucketRateLimiter(capacity=10, per_seconds=60)
+
+    for _ in range(10):
+        assert limiter.allow("user", current_time=0)
+    assert not limiter.allow("user", current_time=0)
+
+    # One token every 6 seconds
+    assert not limiter.allow("user", current_time=5)
+    assert limiter.allow("user", current_time=6)
+    assert not limiter.allow("user", current_time=6)
+
+
+def test_rate_limit_forgets_idle_buckets():
+    """Test that buckets idle for a full refill period are dropped."""
+    limiter = TokenBucketRateLimiter(capacity=10, per_seconds=60)
+
+    _ = limiter.allow("user", current_time=0)
+    assert len(limiter) == 1
+
+    _ = limiter.allow("other", current_time=60)
+    assert len(limiter) == 1
@@ -153,3 +153,40 @@ def test_ticket_cleanup_method():
     # Should not be able to validate after cleanup
     validated_ticket_2 = store.validate_ticket(ticket_id, client_ip)
     assert validated_ticket_2 is None
+
+
+def test_active_tickets_count_excludes_used():
+    """Test that used tickets no longer count as active."""
+    store = TicketStore(default_expiration_seconds=100)
+
+    user_id = UserId(ULID())
+    client_ip = "192.168.1.100"
+
+    ticket = store.generate_ticket(user_id, client_ip, current_time=0)
+    _ = store.generate_ticket(user_id, client_ip, current_time=0)
+
+    assert store.validate_ticket(ticket.ticket_id, client_ip, current_time=0)
+    assert store.get_active_tickets_count(current_time=0) == 1
+
+    store.cleanup_ticket(ticket.ticket_id)
+    assert store.get_active_tickets_count(current_time=0) == 1
+
+    assert store.get_active_tickets_count(current_time=100) == 0
+
+
+def test_ticket_cleanup_keeps_unexpired_tickets():
+    """Test that cleanup removes tickets in expiry order and keeps the rest."""
+    store = TicketStore(default_expiration_seconds=100)
+
+    user_id = UserId(ULID())
+    client_ip = "192.168.1.100"
+
+    early = store.generate_ticket(user_id, client_ip, current_time=0)
+    removed = store.generate_ticket(user_id, client_ip, current_time=10)
+    late = store.generate_ticket(user_id, client_ip, current_time=50)
+    store.cleanup_ticket(removed.ticket_id)
+
+    # Only the first ticket has expired by now
+    assert store.get_active_tickets_count(current_time=120) == 1
+    assert store.validate_ticket(early.ticket_id, client_ip, current_time=120) is None
+    assert store.validate_ticket(late.ticket_id, client_ip, current_time=120) == late
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from interview_helper.security.http import TokenClaims
+from interview_helper.security.token_cache import VerifiedTokenCache
+
+
+def make_claims(exp: float) -> TokenClaims:
+    return TokenClaims(iss="idp", sub="user", exp=int(exp), iat=int(time.time()))
+
+
+def test_token_cache_returns_verified_claims():
+    """Test that a cached token returns its claims."""
+    cache = VerifiedTokenCache()
+    claims = make_claims(time.time() + 3600)
+
+    cache.put("token", claims)
+
+    assert cache.get("token") == claims
+    assert cache.get("other-token") is None
+
+
+def test_token_cache_skips_nearly_expired_tokens():
+    """Test that tokens within the expiry margin are never served from cache."""
+    cache = VerifiedTokenCache(expiry_margin_seconds=30)
+
+    cache.put("token", make_claims(time.time() + 10))
+
+    assert cache.get("token") is None
+
+
+def test_token_cache_caps_entry_lifetime(monkeypatch: pytest.MonkeyPatch):
+    """Test that long-lived tokens still drop out of the cache after the max TTL."""
+    now = [time.time()]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = VerifiedTokenCache(max_ttl_seconds=60)
+
+    cache.put("token", make_claims(now[0] + 3600))
+    assert cache.get("token") is not None
+
+    now[0] += 61
+    assert cache.get("token") is None
@@ -6,6 +6,7 @@ validation for WebSocket connections. Tickets are single-use, time-limited
 tokens that provide an additional layer of security.
 """
 
+import heapq
 import secrets
 import time
 from typing import Dict, Optional
@@ -25,11 +26,12 @@ class Ticket:
     expires_at: float
     used: bool = False
 
-    def is_expired(self, current_time: float = time.time()) -> bool:
+    def is_expired(self, current_time: float | None = None) -> bool:
         """Check if the ticket has expired."""
-        return current_time >= self.expires_at
+        now = time.time() if current_time is None else current_time
+        return now >= self.expires_at
 
-    def is_valid(self, current_time: float = time.time()) -> bool:
+    def is_valid(self, current_time: float | None = None) -> bool:
         """Check if the ticket is valid (not used and not expired)."""
         return not self.used and not self.is_expired(current_time)
 
@@ -53,31 +55,39 @@ class TicketStore:
     def __init__(self, default_expiration_seconds: int = 300):  # 5 minutes
         self._tickets: Dict[str, Ticket] = {}
         self._default_expiration = default_expiration_seconds
+        # Used tickets stay in the store until they expire or are cleaned up, so
+        # track how many there are to count active tickets without a scan.
+        self._used_count: int = 0
+        # (expires_at, ticket_id), so cleanup only looks at tickets that expired.
+        # Entries for tickets removed early are skipped when they come up.
+        self._expiry_heap: list[tuple[float, str]] = []
 
     def generate_ticket(
-        self, user_id: UserId, client_ip: str, current_time: float = time.time()
+        self, user_id: UserId, client_ip: str, current_time: float | None = None
     ) -> Ticket:
         """Generate a new authentication ticket."""
+        now = time.time() if current_time is None else current_time
         ticket_id = secrets.token_urlsafe(32)
-        expires_at = current_time + self._default_expiration
+        expires_at = now + self._default_expiration
 
         ticket = Ticket(
             ticket_id=ticket_id,
             user_id=user_id,
             client_ip=client_ip,
-            created_at=current_time,
+            created_at=now,
             expires_at=expires_at,
         )
 
         self._tickets[ticket_id] = ticket
+        heapq.heappush(self._expiry_heap, (expires_at, ticket_id))
 
         # Clean up expired tickets
-        self._cleanup_expired(current_time)
+        self._cleanup_expired(now)
 
         return ticket
 
     def validate_ticket(
-        self, ticket_id: str, client_ip: str, current_time: float = time.time()
+        self, ticket_id: str, client_ip: str, current_time: float | None = None
     ) -> Optional[Ticket]:
         """
         Validate a ticket and mark it as used if valid.
@@ -90,9 +100,9 @@ class TicketStore:
             return None
 
         # Check if ticket is valid
-        if not ticket.is_valid():
+        if not ticket.is_valid(current_time):
             # Remove invalid ticket
-            self._tickets.pop(ticket_id, None)
+            self._remove(ticket_id)
             return None
 
         # Check if client IP matches
@@ -101,25 +111,26 @@ class TicketStore:
 
         # Mark ticket as used (single-use)
         ticket.used = True
+        self._used_count += 1
 
         return ticket
 
     def cleanup_ticket(self, ticket_id: str) -> None:
         """Remove a specific ticket from the store."""
-        self._tickets.pop(ticket_id, None)
+        self._remove(ticket_id)
+
+    def _remove(self, ticket_id: str) -> None:
+        ticket = self._tickets.pop(ticket_id, None)
+        if ticket is not None and ticket.used:
+            self._used_count -= 1
 
     def _cleanup_expired(self, current_time: float) -> None:
         """Remove expired tickets from the store."""
-        expired_tickets = [
-            ticket_id
-            for ticket_id, ticket in self._tickets.items()
-            if ticket.expires_at < current_time
-        ]
-
-        for ticket_id in expired_tickets:
-            self._tickets.pop(ticket_id, None)
+        while self._expiry_heap and self._expiry_heap[0][0] <= current_time:
+            _, ticket_id = heapq.heappop(self._expiry_heap)
+            self._remove(ticket_id)
 
-    def get_active_tickets_count(self, current_time: float = time.time()) -> int:
+    def get_active_tickets_count(self, current_time: float | None = None) -> int:
         """Get the number of active (valid) tickets."""
-        self._cleanup_expired(current_time)
-        return len([t for t in self._tickets.values() if t.is_valid(current_time)])
+        self._cleanup_expired(time.time() if current_time is None else current_time)
+        return len(self._tickets) - self._used_count
@@ -0,0 +1,51 @@
+"""
+Cache of already verified access tokens.
+
+Clients send the same bearer token on every request until it expires, so the
+signature only needs to be checked the first time it's seen.
+"""
+
+import hashlib
+import time
+
+from cachetools import TLRUCache
+
+from interview_helper.security.http import TokenClaims
+
+
+class VerifiedTokenCache:
+    """
+    Maps a token's digest to its claims, until shortly before it expires.
+
+    Entries are also dropped after `max_ttl_seconds`, which bounds how long a
+    revoked token can keep being accepted from cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        expiry_margin_seconds: int = 30,
+        max_ttl_seconds: int = 300,
+    ):
+        self._expiry_margin: int = expiry_margin_seconds
+        self._max_ttl: int = max_ttl_seconds
+        self._cache: TLRUCache[bytes, TokenClaims] = TLRUCache(
+            maxsize=maxsize, ttu=self._time_to_use, timer=time.time
+        )
+
+    def _time_to_use(self, _key: bytes, claims: TokenClaims, now: float) -> float:
+        return min(claims.exp - self._expiry_margin, now + self._max_ttl)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        # Don't keep the bearer tokens themselves around in memory
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> TokenClaims | None:
+        return self._cache.get(self._key(token))
+
+    def put(self, token: str, claims: TokenClaims) -> None:
+        self._cache[self._key(token)] = claims
+
+    def __len__(self) -> int:
+        return len(self._cache)
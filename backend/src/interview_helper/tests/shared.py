@@ -6,7 +6,9 @@ class FakeWebSocket:
     def __init__(self):
         self.accepted = False
         self.sent_messages: list[str] = []
-        self.send_stream, self.receive_stream = create_memory_object_stream[str](100)
+        self.send_stream, self.receive_stream = create_memory_object_stream[
+            str | WebSocketDisconnect
+        ](100)
         self.closed = False
 
     async def accept(self):
@@ -25,6 +27,6 @@ class FakeWebSocket:
     async def close(self):
         self.closed = True
 
-    def enqueue(self, message):
+    def enqueue(self, message: str | WebSocketDisconnect):
         """Enqueue a message or exception for receive_text to pop."""
         self.send_stream.send_nowait(message)
@@ -3,11 +3,13 @@ from contextlib import asynccontextmanager
 
 from anyio.from_thread import BlockingPortal
 from interview_helper.ai_analysis.ai_analysis import SimpleAnalyzer
-from starlette.websockets import WebSocketDisconnect
 from interview_helper.audio_stream_handler.transcription.transcription import (
     azure_transcriber_consumer_pair,
     vosk_transcriber_consumer_pair,
 )
+from interview_helper.audio_stream_handler.transcription.vosk_transcriber import (
+    prewarm_vosk_recognizers,
+)
 from interview_helper.context_manager.messages import (
     DismissAIAnalysis,
     PingMessage,
@@ -16,32 +18,51 @@ from interview_helper.context_manager.messages import (
 )
 from starlette.responses import RedirectResponse
 from interview_helper.security.http import (
+    OIDCConfig,
+    OIDCUserInfo,
+    fetch_oidc_config,
+    TokenClaims,
     verify_jwt_token,
     get_user_info_from_oidc_provider,
-    get_oidc_userinfo_endpoint,
 )
+from interview_helper.security.jwks_cache import JWKSCache
+from interview_helper.security.rate_limit import TokenBucketRateLimiter
 from interview_helper.security.tickets import TicketResponse
-from typing import Annotated
+from interview_helper.security.token_cache import VerifiedTokenCache
+from collections.abc import Awaitable, Callable
+from typing import Annotated, Any
+from urllib.parse import quote, urlencode
 from fastapi import Request
 from interview_helper.audio_stream_handler.audio_utils import (
     async_audio_write_to_disk_consumer_pair,
 )
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import secrets
+import anyio
+import anyio.abc
+import anyio.to_thread
+from cachetools import LRUCache, TTLCache
 import httpx
-import jwt
-import time
-from collections import defaultdict
 
 from interview_helper.config import Settings
 from interview_helper.context_manager.messages import WebRTCMessage
-from interview_helper.context_manager.session_context_manager import AppContextManager
+from interview_helper.context_manager.session_context_manager import (
+    AppContextManager,
+    SessionContext,
+)
 from interview_helper.context_manager.concurrent_websocket import ConcurrentWebSocket
 from interview_helper.context_manager.resource_keys import (
     ANYIO_BLOCKING_PORTAL,
+    WEBRTC_MESSAGES,
     WEBSOCKET,
 )
 from interview_helper.audio_stream_handler.audio_stream_handler import (
-    handle_webrtc_message,
+    WEBRTC_MESSAGE_BUFFER_SIZE,
+    queue_webrtc_message,
+    webrtc_message_worker,
 )
 from interview_helper.context_manager.database import (
     ProjectListing,
@@ -50,22 +71,37 @@ from interview_helper.context_manager.database import (
     get_all_projects,
     get_or_add_user_by_oidc_id,
     get_project_by_id,
-    get_all_transcripts,
-    get_all_ai_analyses,
+    get_project_catchup,
+)
+from interview_helper.context_manager.types import ProjectId, UserId
+
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi import (
+    FastAPI,
+    WebSocket,
+    WebSocketDisconnect,
+    Depends,
+    HTTPException,
+    status,
 )
-from interview_helper.context_manager.types import ProjectId
-
-from fastapi.security import OpenIdConnect
-from fastapi import FastAPI, WebSocket, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
-# Configure logging
+# Configure logging. Records are queued and written out by a listener thread,
+# so a slow terminal or disk never blocks the event loop.
+log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("transcription_server.log")],
+    handlers=[QueueHandler(log_queue)],
+)
+log_listener = QueueListener(
+    log_queue,
+    logging.StreamHandler(),
+    logging.FileHandler("transcription_server.log"),
 )
+log_listener.start()
+_ = atexit.register(log_listener.stop)
 
 logger = logging.getLogger(__name__)
 
@@ -89,17 +125,39 @@ session_manager = AppContextManager(
     settings=settings,
 )
 
-userinfo_endpoint: str = get_oidc_userinfo_endpoint(
-    session_manager.get_settings().oidc_authority
-)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """background task starts at statrup"""
-    await session_manager.start_background_services()
-    yield
-    await session_manager.stop_background_services()
+    # Database calls and Vosk decoding run in worker threads, so the default
+    # 40-thread limit would cap how many sessions can make progress at once.
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 200
+
+    jwks_refresh_tg: anyio.abc.TaskGroup | None = None
+    try:
+        await load_oidc_config()
+
+        if transcriber_consumer_pair is vosk_transcriber_consumer_pair:
+            # Load the model before the first call instead of during it
+            await anyio.to_thread.run_sync(
+                prewarm_vosk_recognizers, settings.vosk_model_path
+            )
+
+        await session_manager.start_background_services()
+
+        # Entered by hand, like the session manager's services, and exited
+        # below once the app shuts down
+        jwks_refresh_tg = await anyio.create_task_group().__aenter__()
+        _ = jwks_refresh_tg.start_soon(jwks_cache.run_refresh_loop)
+
+        yield
+    finally:
+        # Also runs if startup failed part way
+        if jwks_refresh_tg is not None:
+            jwks_refresh_tg.cancel_scope.cancel()
+            _ = await jwks_refresh_tg.__aexit__(None, None, None)
+        await session_manager.stop_background_services()
+        await http_client.aclose()
 
 
 # Create FastAPI app
@@ -114,7 +172,7 @@ app.add_middleware(
     # FIXME: This is due to Pyrefly not being able to handle Generic ParamSpec and Protocol.
     # pyrefly: ignore[bad-argument-type]
     CORSMiddleware,
-    allow_origins=session_manager.get_settings().cors_allow_origins,
+    allow_origins=settings.cors_allow_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -123,28 +181,121 @@ app.add_middleware(
 # OIDC Configuration - configured via environment variables
 
 OIDC_CONFIG_URL = (
-    session_manager.get_settings().oidc_authority.rstrip("/")
-    + "/.well-known/openid-configuration"
+    settings.oidc_authority.rstrip("/") + "/.well-known/openid-configuration"
 )
-CLIENT_ID = session_manager.get_settings().oidc_client_id
-SITE_URL = session_manager.get_settings().site_url
+CLIENT_ID = settings.oidc_client_id
+SITE_URL = settings.site_url
 REDIRECT_URI = f"{SITE_URL}/auth/callback"
 SCOPE = "openid profile email"
 
-FRONTEND_REDIRECT_URI = session_manager.get_settings().frontend_redirect_uri
+FRONTEND_REDIRECT_URI = settings.frontend_redirect_uri
+
+# Shared by all outbound calls to the OIDC provider, so they reuse
+# connections instead of doing a TLS handshake each time.
+http_client = httpx.AsyncClient(
+    timeout=10,
+    limits=httpx.Limits(max_keepalive_connections=100, keepalive_expiry=60),
+)
 
-oidc_config: dict[str, str] = httpx.get(OIDC_CONFIG_URL).raise_for_status().json()
+# Set from the provider's discovery document by load_oidc_config at startup
+oidc_config: OIDCConfig
+jwks_cache: JWKSCache
+auth_url_prefix: str
+
+# Hands over the bare token, with the "Bearer " scheme already checked and removed
+bearer_scheme = HTTPBearer()
+
+
+async def load_oidc_config() -> None:
+    """Fetches the discovery document and sets up everything that depends on it."""
+    global oidc_config, jwks_cache, auth_url_prefix
+
+    oidc_config = await fetch_oidc_config(OIDC_CONFIG_URL, http_client)
+    jwks_cache = JWKSCache(oidc_config.jwks_uri, http_client=http_client)
+
+    # Everything but the state is fixed, so only build the query string once.
+    # token_urlsafe states need no further quoting.
+    auth_url_prefix = (
+        oidc_config.authorization_endpoint
+        + "?"
+        + urlencode(
+            {
+                "response_type": "code",
+                "client_id": CLIENT_ID,
+                "redirect_uri": REDIRECT_URI,
+                "scope": SCOPE,
+            },
+            quote_via=quote,
+        )
+        + "&state="
+    )
+
+    # Fetch signing keys before the first request needs them
+    await jwks_cache.refresh()
+
+
+verified_tokens = VerifiedTokenCache()
+
+
+async def get_verified_claims(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer_scheme)],
+) -> TokenClaims:
+    """
+    Verifies the bearer token, skipping the signature check for recently seen
+    tokens. Use as a dependency; FastAPI runs it once per request.
+    """
+    clean_token = credentials.credentials
+    claims = verified_tokens.get(clean_token)
+    if claims is None:
+        claims = await verify_jwt_token(
+            clean_token,
+            jwks_cache,
+            oidc_config.issuer,
+            oidc_config.id_token_signing_alg_values_supported,
+        )
+        verified_tokens.put(clean_token, claims)
+
+    return claims
+
+
+# Profile details barely change, so don't ask the provider on every request
+userinfo_cache = TTLCache[str, OIDCUserInfo](maxsize=10_000, ttl=60)
+
+
+async def get_user_info(clean_token: str, sub: str) -> OIDCUserInfo:
+    user_info = userinfo_cache.get(sub)
+    if user_info is None:
+        user_info = await get_user_info_from_oidc_provider(
+            clean_token, oidc_config.userinfo_endpoint, http_client
+        )
+        userinfo_cache[sub] = user_info
 
-signing_algos: str = oidc_config.get("id_token_signing_alg_values_supported", "")
-jwks_client = jwt.PyJWKClient(oidc_config["jwks_uri"])
-AUTHORIZATION_ENDPOINT = oidc_config["authorization_endpoint"]
-TOKEN_ENDPOINT = oidc_config["token_endpoint"]
+    return user_info
+
+
+# The user id for a subject never changes. The name it was last saved with is
+# kept too, so a renamed user still reaches the database to update it.
+user_ids = LRUCache[str, tuple[UserId, str]](maxsize=50_000)
+
+
+async def get_or_add_user_id(sub: str, name: str) -> UserId:
+    cached = user_ids.get(sub)
+    if cached is not None and cached[1] == name:
+        return cached[0]
+
+    user = await anyio.to_thread.run_sync(
+        get_or_add_user_by_oidc_id, session_manager.db, sub, name
+    )
+    user_ids[sub] = (user.user_id, name)
+
+    return user.user_id
 
-oidc_scheme = OpenIdConnect(openIdConnectUrl=OIDC_CONFIG_URL)
 
 # Rate limiting for ticket generation (per user)
-ticket_rate_limit: dict[str, list[float]] = defaultdict(list)
 TICKET_RATE_LIMIT_PER_MINUTE = 10
+ticket_rate_limiter = TokenBucketRateLimiter(
+    capacity=TICKET_RATE_LIMIT_PER_MINUTE, per_seconds=60
+)
 
 
 @app.get("/")
@@ -152,7 +303,9 @@ async def root():
     return "Interview Helper Backend"
 
 
-active_states: dict[str, tuple[str, str]] = {}
+# Login states only matter for the few minutes a login takes, so expire them
+# rather than letting every /login call grow this forever.
+active_states = TTLCache[str, tuple[str, str]](maxsize=100_000, ttl=600)
 
 
 @app.get("/login")
@@ -160,17 +313,10 @@ async def login_redirect():
     """
     Frontend calls this endpoint to initiate the login flow.
     """
-    state = "some_random_string_from_the_frontend"  # In a real app, generate a secure random string
+    state = secrets.token_urlsafe(32)
     active_states[state] = ("valid", "")
 
-    auth_url = (
-        f"{AUTHORIZATION_ENDPOINT}?"
-        f"response_type=code&"
-        f"client_id={CLIENT_ID}&"
-        f"redirect_uri={REDIRECT_URI}&"
-        f"scope={SCOPE}&"
-        f"state={state}"
-    )
+    auth_url = auth_url_prefix + state
     return RedirectResponse(auth_url)
 
 
@@ -191,7 +337,9 @@ async def health_check():
 
 @app.get("/auth/ticket", response_model=TicketResponse)
 async def generate_websocket_ticket(
-    request: Request, token: Annotated[str, Depends(oidc_scheme)]
+    request: Request,
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer_scheme)],
+    user_claims: Annotated[TokenClaims, Depends(get_verified_claims)],
 ):
     """
     Generate an authentication ticket for WebSocket connections.
@@ -202,30 +350,16 @@ async def generate_websocket_ticket(
 
     Rate limited to prevent abuse: 10 tickets per minute per user.
     """
-    # Verify the JWT token
-    clean_token = token.removeprefix("Bearer ")
-    user_claims = verify_jwt_token(clean_token, jwks_client, CLIENT_ID, signing_algos)
+    clean_token = credentials.credentials
 
     # Rate limiting check
-    current_time = time.time()
-    user_requests = ticket_rate_limit[user_claims.sub]
-
-    # Remove old requests (older than 1 minute)
-    user_requests[:] = [
-        req_time for req_time in user_requests if current_time - req_time < 60
-    ]
-
-    # Check if user exceeded rate limit
-    if len(user_requests) >= TICKET_RATE_LIMIT_PER_MINUTE:
-        logger.warning(f"Rate limit exceeded for user {user_claims.sub}")
+    if not ticket_rate_limiter.allow(user_claims.sub):
+        logger.warning("Rate limit exceeded for user %s", user_claims.sub)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Too many ticket requests. Please wait before requesting another ticket.",
         )
 
-    # Add current request timestamp
-    user_requests.append(current_time)
-
     # Get client IP address
     if not request.client:
         raise HTTPException(
@@ -234,18 +368,19 @@ async def generate_websocket_ticket(
         )
 
     client_ip = request.client.host
-    user_info = await get_user_info_from_oidc_provider(clean_token, userinfo_endpoint)
+    user_info = await get_user_info(clean_token, user_claims.sub)
 
     name = f"{user_info.given_name or ''} {user_info.family_name or ''}".strip()
-    user_id = get_or_add_user_by_oidc_id(
-        session_manager.db, user_claims.sub, name
-    ).user_id
+    user_id = await get_or_add_user_id(user_claims.sub, name)
 
     # Generate the ticket using the user ID
     ticket = session_manager.ticket_store.generate_ticket(user_id, client_ip)
 
     logger.info(
-        f"Generated WebSocket ticket {ticket.ticket_id} for user {user_claims.sub} from IP {client_ip}"
+        "Generated WebSocket ticket %s for user %s from IP %s",
+        ticket.ticket_id,
+        user_claims.sub,
+        client_ip,
     )
 
     return TicketResponse(
@@ -254,6 +389,34 @@ async def generate_websocket_ticket(
     )
 
 
+async def handle_ping(context: SessionContext, _message: PingMessage):
+    ws = await context.get(WEBSOCKET)
+    assert ws is not None, "WebSocket is always registered before messages are read"
+    await ws.send_message(PONG)
+
+
+async def handle_dismiss_ai_analysis(
+    context: SessionContext, message: DismissAIAnalysis
+):
+    await anyio.to_thread.run_sync(
+        dismiss_ai_analysis,
+        session_manager.db,
+        message.analysis_id,
+        context.get_user_id(),
+    )
+
+
+# Replies to every ping are identical, so share one
+PONG = PingMessage()
+
+# Handlers for messages clients send over the websocket, by message type
+MESSAGE_HANDLERS: dict[type, Callable[[SessionContext, Any], Awaitable[None]]] = {  # pyright: ignore[reportExplicitAny]
+    WebRTCMessage: queue_webrtc_message,
+    PingMessage: handle_ping,
+    DismissAIAnalysis: handle_dismiss_ai_analysis,
+}
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket, ticket_id: str | None, project_id: str | None = None
@@ -294,19 +457,23 @@ async def websocket_endpoint(
             return
 
         logger.info(
-            f"WebSocket connection authenticated for user: {str(ticket.user_id)[0:6]} using ticket {ticket_id}"
+            "WebSocket connection authenticated for user: %.6s using ticket %s",
+            ticket.user_id,
+            ticket_id,
         )
 
         # Clean up the used ticket
         session_manager.ticket_store.cleanup_ticket(ticket_id)
 
     except Exception as e:
-        logger.warning(f"WebSocket ticket validation failed: {e}")
+        logger.warning("WebSocket ticket validation failed: %s", e)
         await websocket.close(code=1008, reason="Authentication failed")
         return
 
     # Validate project exists
-    project = get_project_by_id(session_manager.db, project_id_typed)
+    project = await anyio.to_thread.run_sync(
+        get_project_by_id, session_manager.db, project_id_typed
+    )
     if not project:
         await websocket.close(code=1008, reason="Project not found")
         return
@@ -315,7 +482,7 @@ async def websocket_endpoint(
     context = await session_manager.new_session(
         user_id=ticket.user_id, project_id=project_id_typed
     )
-    print(f"Opened new session {context.session_id} for user {ticket.user_id}")
+    logger.info("Opened new session %s for user %s", context.session_id, ticket.user_id)
 
     cws = ConcurrentWebSocket(already_accepted_ws=websocket)
 
@@ -326,11 +493,12 @@ async def websocket_endpoint(
                 await context.register(WEBSOCKET, cws)
 
                 # Send catchup message with current transcript and insights
-                transcripts = get_all_transcripts(session_manager.db, project_id_typed)
-                transcript_text = " ".join(transcripts)
-
-                ai_analyses = get_all_ai_analyses(session_manager.db, project_id_typed)
-                insights = [analysis for analysis in ai_analyses if analysis]
+                # Off the event loop, since this reads the whole project history
+                catchup = await anyio.to_thread.run_sync(
+                    get_project_catchup, session_manager.db, project_id_typed
+                )
+                transcript_text = " ".join(catchup.transcripts)
+                insights = [analysis for analysis in catchup.ai_analyses if analysis]
 
                 catchup_msg = CatchupMessage(
                     transcript=transcript_text,
@@ -345,58 +513,57 @@ async def websocket_endpoint(
                 )
                 await cws.send_message(metadata_msg)
 
-                while True:
-                    message = await cws.receive_message()
-
-                    if isinstance(message, WebRTCMessage):
-                        await handle_webrtc_message(context, message)
-                    elif isinstance(message, PingMessage):
-                        await cws.send_message(PingMessage())
-                    elif isinstance(message, DismissAIAnalysis):
-                        dismiss_ai_analysis(
-                            session_manager.db, message.analysis_id, ticket.user_id
-                        )
-                    # handle other message types...
-    except WebSocketDisconnect:
-        logger.info(f"WebSocket disconnected for session {context.session_id}")
-    except Exception as e:
-        logger.error(
-            f"Error in WebSocket handler for session {context.session_id}: {e}"
-        )
+                send_webrtc, receive_webrtc = anyio.create_memory_object_stream[
+                    WebRTCMessage
+                ](WEBRTC_MESSAGE_BUFFER_SIZE)
+                await context.register(WEBRTC_MESSAGES, send_webrtc)
+
+                async with anyio.create_task_group() as tg, send_webrtc:
+                    _ = tg.start_soon(webrtc_message_worker, context, receive_webrtc)
+
+                    async for message in cws:
+                        handler = MESSAGE_HANDLERS.get(type(message))
+                        if handler is not None:
+                            await handler(context, message)
+
+                    # Pending signaling is useless once the client is gone
+                    tg.cancel_scope.cancel()
+
+                logger.info("WebSocket disconnected for session %s", context.session_id)
+    except* WebSocketDisconnect:
+        # The client went away while a message to it was still being sent
+        logger.info("WebSocket disconnected for session %s", context.session_id)
     finally:
         await context.teardown()
-        logger.info(f"Closed session {context.session_id} for user {ticket.user_id}")
+        logger.info("Closed session %s for user %s", context.session_id, ticket.user_id)
 
 
 @app.get("/project")
-async def list_all_projects(token: Annotated[str, Depends(oidc_scheme)]):
+async def list_all_projects(
+    _user_claims: Annotated[TokenClaims, Depends(get_verified_claims)],
+):
     """
     Returns all projects with details
     """
-    clean_token = token.removeprefix("Bearer ")
-    _user_claims = verify_jwt_token(clean_token, jwks_client, CLIENT_ID, signing_algos)
-    return get_all_projects(session_manager.db)
+    return await anyio.to_thread.run_sync(get_all_projects, session_manager.db)
 
 
 @app.post("/project")
 async def create_project(
-    project_name: str, token: Annotated[str, Depends(oidc_scheme)]
+    project_name: str,
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(bearer_scheme)],
+    user_claims: Annotated[TokenClaims, Depends(get_verified_claims)],
 ) -> ProjectListing:
     """
     Creates a new project
     """
-    clean_token = token.removeprefix("Bearer ")
-    user_claims = verify_jwt_token(clean_token, jwks_client, CLIENT_ID, signing_algos)
-
-    user_info = await get_user_info_from_oidc_provider(clean_token, userinfo_endpoint)
+    user_info = await get_user_info(credentials.credentials, user_claims.sub)
 
     name = f"{user_info.given_name or ''} {user_info.family_name or ''}".strip()
-    user_id = get_or_add_user_by_oidc_id(
-        session_manager.db, user_claims.sub, name
-    ).user_id
+    user_id = await get_or_add_user_id(user_claims.sub, name)
 
-    new_project: ProjectListing = create_new_project(
-        session_manager.db, user_id, project_name
+    new_project: ProjectListing = await anyio.to_thread.run_sync(
+        create_new_project, session_manager.db, user_id, project_name
     )
 
     return new_project
@@ -406,12 +573,20 @@ if __name__ == "__main__":
     try:
         uvicorn.run(
             app,
-            host=session_manager.get_settings().server_host,
-            port=session_manager.get_settings().server_port,
+            host=settings.server_host,
+            port=settings.server_port,
             log_level="info",
+            # Both come with fastapi[standard]. Ask for them explicitly so a
+            # missing install fails loudly instead of falling back to the
+            # slower pure-Python implementations.
+            loop="uvloop",
+            http="httptools",
+            # /ws messages are small JSON (signaling, transcripts, insights), so
+            # compressing each one costs more CPU than the bytes it saves.
+            ws_per_message_deflate=False,
         )
     except KeyboardInterrupt:
         logger.info("🛑 Server stopped by user")
     except Exception as e:
-        logger.error(f"❌ Server error: {e}")
+        logger.error("❌ Server error: %s", e)
         exit(1)